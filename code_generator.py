@@ -1,3 +1,29 @@
+# Instruction node types that _translate_algo hands to _translate_instr
+_INSTR_TYPES = frozenset(
+    (
+        "ASSIGN",
+        "PRINT",
+        "HALT",
+        "IF",
+        "WHILE",
+        "DO_UNTIL",
+        "BRANCH",
+        "LOOP",
+        "CALL",
+    )
+)
+
+# SPL binary operators -> target symbols
+_BINOP_SYMBOLS = {
+    "plus": "+",
+    "minus": "-",
+    "mult": "*",
+    "div": "/",
+    "eq": "=",
+    "gt": ">",
+}
+
+
 class CodeGenerator:
     def __init__(self, symbol_table):
         self.symbol_table = symbol_table
@@ -55,7 +81,7 @@ class CodeGenerator:
         code = []
 
         for child in algo_node.children:
-            if child.type in ["ASSIGN", "PRINT", "HALT", "BRANCH", "LOOP", "CALL"]:
+            if child.type in _INSTR_TYPES:
                 code.extend(self._translate_instr(child))
 
         return code
@@ -71,6 +97,15 @@ class CodeGenerator:
         elif instr_node.type == "ASSIGN":
             return self._translate_assign(instr_node)
 
+        elif instr_node.type == "IF":
+            return self._translate_if(instr_node)
+
+        elif instr_node.type == "WHILE":
+            return self._translate_while(instr_node)
+
+        elif instr_node.type == "DO_UNTIL":
+            return self._translate_do_until(instr_node)
+
         elif instr_node.type == "BRANCH":
             return self._translate_branch(instr_node)
 
@@ -191,112 +226,117 @@ class CodeGenerator:
 
     def _get_binop_symbol(self, op_name):
         """Convert SPL binary operators to target symbols"""
-        op_map = {
-            "plus": "+",
-            "minus": "-",
-            "mult": "*",
-            "div": "/",
-            "eq": "=",
-            "gt": ">",
-        }
-        return op_map.get(op_name, op_name)
+        return _BINOP_SYMBOLS.get(op_name, op_name)
 
     def _translate_branch(self, branch_node):
+        """Translate a legacy BRANCH wrapper around an IF node"""
+        if branch_node.children and branch_node.children[0].type == "IF":
+            return self._translate_if(branch_node.children[0])
+        return []
+
+    def _translate_if(self, if_node):
         """Translate if statements"""
         code = []
 
-        if branch_node.children and branch_node.children[0].type == "IF":
-            if_node = branch_node.children[0]
+        # Get condition, then_algo, and possibly else_algo
+        condition_node = if_node.children[0] if len(if_node.children) > 0 else None
+        then_algo = if_node.children[1] if len(if_node.children) > 1 else None
+        else_algo = if_node.children[2] if len(if_node.children) > 2 else None
 
-            # Get condition, then_algo, and possibly else_algo
-            condition_node = if_node.children[0] if len(if_node.children) > 0 else None
-            then_algo = if_node.children[1] if len(if_node.children) > 1 else None
-            else_algo = if_node.children[2] if len(if_node.children) > 2 else None
+        # Generate labels
+        label_true = self.new_label()
+        label_exit = self.new_label()
 
-            # Generate labels
-            label_true = self.new_label()
-            label_exit = self.new_label()
+        # Generate condition code
+        cond_code, cond_result = self._translate_term(condition_node)
+        code.extend(cond_code)
 
-            # Generate condition code
-            cond_code, cond_result = self._translate_term(condition_node)
-            code.extend(cond_code)
+        if else_algo:
+            # if-else form
+            code.append(f"IF {cond_result} = 1 THEN {label_true}")
 
-            if else_algo:
-                # if-else form
-                code.append(f"IF {cond_result} = 1 THEN {label_true}")
+            # else part
+            code.extend(self._translate_algo(else_algo))
+            code.append(f"GOTO {label_exit}")
 
-                # else part
-                code.extend(self._translate_algo(else_algo))
-                code.append(f"GOTO {label_exit}")
+            # then part
+            code.append(f"REM {label_true}")
+            code.extend(self._translate_algo(then_algo))
+            code.append(f"REM {label_exit}")
 
-                # then part
-                code.append(f"REM {label_true}")
-                code.extend(self._translate_algo(then_algo))
-                code.append(f"REM {label_exit}")
-
-            else:
-                # if-only form
-                code.append(f"IF {cond_result} = 1 THEN {label_true}")
-                code.append(f"GOTO {label_exit}")
+        else:
+            # if-only form
+            code.append(f"IF {cond_result} = 1 THEN {label_true}")
+            code.append(f"GOTO {label_exit}")
 
-                # then part
-                code.append(f"REM {label_true}")
-                code.extend(self._translate_algo(then_algo))
-                code.append(f"REM {label_exit}")
+            # then part
+            code.append(f"REM {label_true}")
+            code.extend(self._translate_algo(then_algo))
+            code.append(f"REM {label_exit}")
 
         return code
 
     def _translate_loop(self, loop_node):
-        """Translate while and do-until loops"""
+        """Translate a legacy LOOP wrapper around a WHILE or DO node"""
+        if loop_node.children:
+            inner = loop_node.children[0]
+
+            if inner.type == "WHILE":
+                return self._translate_while(inner)
+
+            elif inner.type in ("DO", "DO_UNTIL"):
+                return self._translate_do_until(inner)
+
+        return []
+
+    def _translate_while(self, while_node):
+        """Translate while TERM { ALGO }"""
         code = []
 
-        if loop_node.children:
-            loop_type = loop_node.children[0].type
+        condition_node = while_node.children[0]
+        body_algo = while_node.children[1]
 
-            if loop_type == "WHILE":
-                # while TERM { ALGO }
-                while_node = loop_node.children[0]
-                condition_node = while_node.children[0]
-                body_algo = while_node.children[1]
+        label_start = self.new_label()
+        label_body = self.new_label()
+        label_exit = self.new_label()
 
-                label_start = self.new_label()
-                label_body = self.new_label()
-                label_exit = self.new_label()
+        code.append(f"REM {label_start}")
 
-                code.append(f"REM {label_start}")
+        # Generate condition
+        cond_code, cond_result = self._translate_term(condition_node)
+        code.extend(cond_code)
 
-                # Generate condition
-                cond_code, cond_result = self._translate_term(condition_node)
-                code.extend(cond_code)
+        code.append(f"IF {cond_result} = 1 THEN {label_body}")
+        code.append(f"GOTO {label_exit}")
 
-                code.append(f"IF {cond_result} = 1 THEN {label_body}")
-                code.append(f"GOTO {label_exit}")
+        code.append(f"REM {label_body}")
+        code.extend(self._translate_algo(body_algo))
+        code.append(f"GOTO {label_start}")
 
-                code.append(f"REM {label_body}")
-                code.extend(self._translate_algo(body_algo))
-                code.append(f"GOTO {label_start}")
+        code.append(f"REM {label_exit}")
 
-                code.append(f"REM {label_exit}")
+        return code
+
+    def _translate_do_until(self, do_node):
+        """Translate do { ALGO } until TERM"""
+        code = []
 
-            elif loop_type == "DO":
-                # do { ALGO } until TERM
-                do_node = loop_node.children[0]
-                body_algo = do_node.children[0]
-                condition_node = do_node.children[1]
+        body_algo = do_node.children[0]
+        condition_node = do_node.children[1]
 
-                label_start = self.new_label()
-                label_exit = self.new_label()
+        label_start = self.new_label()
+        label_exit = self.new_label()
 
-                code.append(f"REM {label_start}")
-                code.extend(self._translate_algo(body_algo))
+        code.append(f"REM {label_start}")
+        code.extend(self._translate_algo(body_algo))
 
-                # Generate condition
-                cond_code, cond_result = self._translate_term(condition_node)
-                code.extend(cond_code)
+        # Generate condition
+        cond_code, cond_result = self._translate_term(condition_node)
+        code.extend(cond_code)
 
-                code.append(f"IF {cond_result} = 1 THEN {label_exit}")
-                code.append(f"GOTO {label_start}")
-                code.append(f"REM {label_exit}")
+        code.append(f"IF {cond_result} = 1 THEN {label_exit}")
+        code.append(f"GOTO {label_start}")
+        code.append(f"REM {label_exit}")
 
         return code
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
 import json
+import re
 
 class LexerError(Exception):
     def __init__(self, message: str, line: int, col: int):
@@ -9,7 +10,7 @@ class LexerError(Exception):
         self.line = line
         self.col = col
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Token:
     type: str
     value: str
@@ -65,6 +66,31 @@ class TokenType(str, Enum):
 # keyword string -> TokenType (only the lowercase-valued items)
 KEYWORDS = {t.value: t for t in TokenType if t.value.islower()}
 
+# single-char punctuation -> TokenType
+PUNCTUATION = {
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+    ";": TokenType.SEMI,
+    "=": TokenType.ASSIGN,
+    ">": TokenType.GT,
+}
+
+# Fast path: every well-formed ASCII token (and whitespace run) in one pattern.
+# Anything it does not match falls back to the per-character scanners, which
+# also produce all LexerError messages.
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<WS>[ \t\r\n]+)
+  | (?P<STRING>"[A-Za-z0-9]{0,15}")
+  | (?P<NUMBER>0(?![0-9])|[1-9][0-9]*)
+  | (?P<WORD>[a-z][a-z0-9]*)
+  | (?P<PUNCT>[(){};=>])
+    """,
+    re.VERBOSE,
+)
+
 class Lexer:
     """
     SPL lexer with the following rules:
@@ -101,10 +127,6 @@ class Lexer:
     def _make(self, ttype: TokenType, value: str, line: int, col: int) -> Token:
         return Token(ttype.value, value, line, col)
 
-    def _skip_whitespace(self):
-        while self.i < self.n and self._peek() in " \t\r\n":
-            self._advance()
-
     # --- scanners for specific token kinds ---
     def _read_string(self) -> Token:
         # precondition: current char is '"'
@@ -168,10 +190,50 @@ class Lexer:
         return self
 
     def __next__(self) -> Token:
-        self._skip_whitespace()
+        m = _TOKEN_RE.match(self.source, self.i)
+        if m is not None and m.lastgroup == "WS":
+            ws = m.group()
+            self.i = m.end()
+            newlines = ws.count("\n")
+            if newlines:
+                self.line += newlines
+                self.col = len(ws) - ws.rindex("\n")
+            else:
+                self.col += len(ws)
+            m = _TOKEN_RE.match(self.source, self.i)
         if self.i >= self.n:
             raise StopIteration
 
+        if m is not None:
+            end = m.end()
+            kind = m.lastgroup
+            # Words and numbers followed by a non-ASCII char may continue
+            # (str.islower/isdigit accept it), so leave those to the scanners
+            if (
+                kind == "STRING"
+                or kind == "PUNCT"
+                or end >= self.n
+                or self.source[end] < "\x80"
+            ):
+                lexeme = m.group()
+                line, col = self.line, self.col
+                self.i = end
+                self.col += end - m.start()
+                if kind == "WORD":
+                    ttype = KEYWORDS.get(lexeme, TokenType.IDENT)
+                elif kind == "PUNCT":
+                    ttype = PUNCTUATION[lexeme]
+                elif kind == "NUMBER":
+                    ttype = TokenType.NUMBER
+                else:
+                    ttype = TokenType.STRING
+                    lexeme = lexeme[1:-1]
+                return self._make(ttype, lexeme, line, col)
+
+        return self._next_slow()
+
+    def _next_slow(self) -> Token:
+        # precondition: not at end of input, no leading whitespace
         ch = self._peek()
         line, col = self.line, self.col
 
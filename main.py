@@ -1,7 +1,7 @@
 # main.py
 
 from lexer import Lexer, LexerError, TokenType
-from parser import build_spl_grammar, SLRParser, Token, TokenType
+from parser import get_spl_parser, Token, TokenType
 from syntax_tree import ProgramNode, VarDeclNode, ASTNode, build_ast
 from symbol_table import SymbolTable, build_symbol_table
 from type_checker import TypeChecker
@@ -11,18 +11,15 @@ from basic_converter import convert_intermediate_to_basic
 import sys
 
 
+# Token types the parser sees by type name; everything else by its value
+_PASSTHROUGH_TYPES = frozenset({"IDENT", "NUMBER", "STRING"})
+
+
 def convert_lexer_token_to_parser_string(token):
     """Convert a lexer Token to a string the parser expects"""
-    # For identifiers, numbers, and strings, use the token type name
-    if token.type == "IDENT":
-        return "IDENT"
-    elif token.type == "NUMBER":
-        return "NUMBER"
-    elif token.type == "STRING":
-        return "STRING"
-    else:
-        # For keywords and symbols, use the actual token value
-        return token.value
+    # For identifiers, numbers, and strings, use the token type name;
+    # for keywords and symbols, use the actual token value
+    return token.type if token.type in _PASSTHROUGH_TYPES else token.value
 
 
 def compile_spl_from_file(input_file, output_bas):
@@ -77,8 +74,7 @@ def compile_spl_from_file(input_file, output_bas):
 
     # Parse
     try:
-        grammar = build_spl_grammar()
-        parser = SLRParser(grammar)
+        parser = get_spl_parser()
         print(f"\n🔄 Starting parse...")
 
         result = parser.parse(parser_tokens)
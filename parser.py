@@ -1,5 +1,7 @@
 from collections import defaultdict
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 
 
 # ========================
@@ -45,12 +47,12 @@ class TokenType(str, Enum):
     EOF = "EOF"
 
 
+@dataclass(frozen=True, slots=True, repr=False)
 class Token:
-    def __init__(self, type_: TokenType, value: str, line: int = 1, col: int = 1):
-        self.type = type_
-        self.value = value
-        self.line = line
-        self.col = col
+    type: TokenType
+    value: str
+    line: int = 1
+    col: int = 1
 
     def __repr__(self):
         return f"Token({self.type}, '{self.value}')"
@@ -332,6 +334,7 @@ class SLRParser:
 # ========================
 # SPL Grammar Definition
 # ========================
+@lru_cache(maxsize=1)
 def build_spl_grammar():
     productions = {
         "S'": [["SPL_PROG"]],
@@ -421,13 +424,18 @@ def build_spl_grammar():
     return Grammar("S'", productions)
 
 
+@lru_cache(maxsize=1)
+def get_spl_parser():
+    """Return a shared SLRParser for the SPL grammar, building its tables once"""
+    return SLRParser(build_spl_grammar())
+
+
 # ========================
 # Test Functions
 # ========================
 def test_simple_program():
     """Test with a simple SPL program"""
-    grammar = build_spl_grammar()
-    parser = SLRParser(grammar)
+    parser = get_spl_parser()
 
     # Create token objects like your lexer would produce
     tokens = [
@@ -469,8 +477,7 @@ def test_simple_program():
 
 def test_with_string_tokens():
     """Test with string tokens directly"""
-    grammar = build_spl_grammar()
-    parser = SLRParser(grammar)
+    parser = get_spl_parser()
 
     tokens = [
         "glob",
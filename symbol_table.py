@@ -1,15 +1,33 @@
 import itertools
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Compact per-symbol record stored in SymbolTable.symbols:
+# (sym_type, scope, node_id, extra)
+SymbolEntry = Tuple[str, str, int, Optional[Dict[str, Any]]]
+
+
+class DuplicateSymbolError(Exception):
+    """Raised when a name is declared twice in the same scope."""
 
 
 class Symbol:
-    def __init__(self, name, sym_type, scope, node_id, extra=None):
+    __slots__ = ("name", "type", "scope", "node_id", "extra")
+
+    def __init__(
+        self,
+        name: str,
+        sym_type: str,
+        scope: str,
+        node_id: int,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
         self.name = name
         self.type = sym_type  # "var", "func", "proc"
         self.scope = scope
         self.node_id = node_id
         self.extra = extra or {}
 
-    def to_row(self):
+    def to_row(self) -> List[str]:
         extras = (
             ", ".join(f"{k}={v}" for k, v in self.extra.items()) if self.extra else ""
         )
@@ -17,65 +35,163 @@ class Symbol:
 
 
 class SymbolTable:
+    __slots__ = ("scope_name", "parent", "symbols", "children", "_var_names")
+
     _id_counter = itertools.count()
 
-    def __init__(self, scope_name="everywhere", parent=None):
+    def __init__(
+        self, scope_name: str = "everywhere", parent: Optional["SymbolTable"] = None
+    ) -> None:
         self.scope_name = scope_name
         self.parent = parent
-        self.symbols = {}  # name -> Symbol
-        self.children = []
-
-    def add(self, name, sym_type, node_id=None, extra=None):
+        self.symbols: Dict[str, SymbolEntry] = {}  # name -> SymbolEntry
+        self.children: List["SymbolTable"] = []
+        # visible_var_names() cache; None until first queried or after a change
+        self._var_names: Optional[FrozenSet[str]] = None
+
+    def add(
+        self,
+        name: str,
+        sym_type: str,
+        node_id: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
         if name in self.symbols:
-            raise Exception(
+            raise DuplicateSymbolError(
                 f"[Name-Rule-Violation] '{name}' already declared in scope '{self.scope_name}'"
             )
-        self.symbols[name] = Symbol(
-            name, sym_type, self.scope_name, node_id or next(self._id_counter), extra
+        self.symbols[name] = (
+            sym_type,
+            self.scope_name,
+            node_id or next(self._id_counter),
+            extra,
         )
-
-    def lookup(self, name):
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.lookup(name)
+        self._drop_var_names()
+
+    def add_many(self, entries: Iterable[Tuple[str, str, Optional[int]]]) -> None:
+        """Add (name, sym_type, node_id) triples, same rules as add().
+
+        All-or-nothing: every name is checked, against the scope and the rest
+        of the batch, before any is inserted.
+        """
+        entries = list(entries)
+        symbols = self.symbols
+        scope_name = self.scope_name
+        seen = set()
+        for name, _sym_type, _node_id in entries:
+            if name in symbols or name in seen:
+                raise DuplicateSymbolError(
+                    f"[Name-Rule-Violation] '{name}' already declared in scope '{scope_name}'"
+                )
+            seen.add(name)
+        id_counter = self._id_counter
+        for name, sym_type, node_id in entries:
+            symbols[name] = (sym_type, scope_name, node_id or next(id_counter), None)
+        self._drop_var_names()
+
+    def lookup_entry(self, name: str) -> Optional[SymbolEntry]:
+        """Return the raw (sym_type, scope, node_id, extra) record for name."""
+        scope: Optional[SymbolTable] = self
+        while scope is not None:
+            entry = scope.symbols.get(name)
+            if entry is not None:
+                return entry
+            scope = scope.parent
         return None
 
-    def create_child_scope(self, name):
+    def visible_var_names(self) -> FrozenSet[str]:
+        """Names that resolve to a "var" from this scope, honouring shadowing."""
+        names = self._var_names
+        if names is None:
+            parent = self.parent
+            if parent is None:
+                inherited: FrozenSet[str] = frozenset()
+            else:
+                inherited = parent.visible_var_names()
+            own = self.symbols
+            if own:
+                own_vars = {n for n, entry in own.items() if entry[0] == "var"}
+                names = (inherited - own.keys()) | own_vars
+            else:
+                # nothing declared here (yet): share the parent's set
+                names = inherited
+            self._var_names = names
+        return names
+
+    def _drop_var_names(self) -> None:
+        # A declaration here changes what every descendant scope can see.
+        # A scope only caches its set after its parent has, so below a scope
+        # with no cached set there is nothing to drop.
+        stack = [self]
+        while stack:
+            table = stack.pop()
+            if table._var_names is None:
+                continue
+            table._var_names = None
+            stack.extend(table.children)
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        entry = self.lookup_entry(name)
+        if entry is None:
+            return None
+        return Symbol(name, *entry)
+
+    def reset(self) -> None:
+        """Drop all symbols and child scopes so the table can be reused."""
+        self._drop_var_names()
+        self.symbols.clear()
+        self.children.clear()
+
+    def create_child_scope(self, name: str) -> "SymbolTable":
         child = SymbolTable(scope_name=name, parent=self)
         self.children.append(child)
         return child
 
-    def pretty_print(self, indent=0):
-        pad = "  " * indent
-        out = f"\n"
-        out += f"{pad}Scope: {self.scope_name}\n"
-        if self.symbols:
-            col_names = ["Name", "Type", "ID", "Extra"]
-            # Determine column widths
-            rows = [sym.to_row() for sym in self.symbols.values()]
-            widths = [
-                max(len(str(cell)) for cell in [col] + [row[i] for row in rows])
-                for i, col in enumerate(col_names)
-            ]
-            # Header
-            header = " | ".join(col.ljust(widths[i]) for i, col in enumerate(col_names))
-            out += pad + header + "\n"
-            out += pad + "-+-".join("-" * w for w in widths) + "\n"
-            # Rows
-            for row in rows:
-                out += (
-                    pad
-                    + " | ".join(row[i].ljust(widths[i]) for i in range(len(col_names)))
-                    + "\n"
+    def pretty_print(self, indent: int = 0) -> str:
+        out = []
+        stack = [(self, indent)]
+
+        while stack:
+            table, depth = stack.pop()
+            pad = "  " * depth
+            out.append("\n")
+            out.append(f"{pad}Scope: {table.scope_name}\n")
+            if table.symbols:
+                col_names = ["Name", "Type", "ID", "Extra"]
+                # Determine column widths
+                rows = [
+                    Symbol(name, *entry).to_row()
+                    for name, entry in table.symbols.items()
+                ]
+                widths = [
+                    max(len(str(cell)) for cell in [col] + [row[i] for row in rows])
+                    for i, col in enumerate(col_names)
+                ]
+                # Header
+                header = " | ".join(
+                    col.ljust(widths[i]) for i, col in enumerate(col_names)
                 )
-        else:
-            out += pad + "(no symbols)\n"
-        for c in self.children:
-            out += c.pretty_print(indent + 1)
-        return out
-
-    def __repr__(self):
+                out.append(pad + header + "\n")
+                out.append(pad + "-+-".join("-" * w for w in widths) + "\n")
+                # Rows
+                for row in rows:
+                    out.append(
+                        pad
+                        + " | ".join(
+                            row[i].ljust(widths[i]) for i in range(len(col_names))
+                        )
+                        + "\n"
+                    )
+            else:
+                out.append(pad + "(no symbols)\n")
+
+            # Push children reversed so they are printed in order
+            for c in reversed(table.children):
+                stack.append((c, depth + 1))
+
+        return "".join(out)
+
+    def __repr__(self) -> str:
         return self.pretty_print()
 
 
@@ -85,14 +201,16 @@ def build_symbol_table(ast_root):
 
     # global scope
     globals_scope = root.create_child_scope("global")
-    for child in ast_root.children[0].children:  # GLOBALS
-        globals_scope.add(child.value, "var", node_id=child.id)
+    globals_scope.add_many(
+        (child.value, "var", child.id) for child in ast_root.children[0].children
+    )  # GLOBALS
 
     # main scope
     main_scope = root.create_child_scope("main")
     vars_node, algo_node = ast_root.children[3].children
-    for child in vars_node.children:  # VARS
-        main_scope.add(child.value, "var", node_id=child.id)
+    main_scope.add_many(
+        (child.value, "var", child.id) for child in vars_node.children
+    )  # VARS
 
     return root
 
@@ -1,40 +1,70 @@
 import itertools
+import sys
+from typing import Any, Iterable, List, Optional
+
+# Shared children container for leaf nodes
+_EMPTY_CHILDREN = ()
+
+# pretty_print connectors and prefix extensions, indexed by is_last
+_CONNECTORS = ("├─ ", "└─ ")
+_PREFIXES = ("│  ", "   ")
+
+# Token types that open a unary / binary operation inside a TERM
+_UNOP_TOKENS = frozenset(("neg", "not"))
+_BINOP_TOKENS = frozenset(("eq", "GT", "or", "and", "plus", "minus", "mult", "div"))
 
 
 class ASTNode:
+    __slots__ = ("id", "type", "value", "children", "term_type")
+
     _id_counter = itertools.count()
 
-    def __init__(self, nodetype, value=None, children=None):
+    def __init__(
+        self,
+        nodetype: str,
+        value: Any = None,
+        children: Optional[Iterable["ASTNode"]] = None,
+    ) -> None:
         self.id = next(ASTNode._id_counter)
-        self.type = nodetype
+        # Interned so checkers may compare node types by identity
+        self.type = sys.intern(nodetype)
         self.value = value
-        self.children = children or []
-
-    def add_child(self, node):
-        self.children.append(node)
-
-    def pretty_print(self, prefix="", is_last=True):
-        connector = "└─ " if is_last else "├─ "
-        val_str = f": {self.value}" if self.value is not None else ""
-        s = f"{prefix}{connector}{self.type}{val_str} (id={self.id})\n"
+        # Children are stored as a tuple; code that builds a node up piece by
+        # piece collects a list and assigns the tuple once (see ASTBuilder)
+        self.children = tuple(children) if children else _EMPTY_CHILDREN
+        # Cache written by the type checker: the TermType of a well-typed,
+        # VAR-free term. It depends only on this subtree, so a node shared
+        # between trees or checker runs can keep it.
+        self.term_type = None
+
+    def pretty_print(self, prefix: str = "", is_last: bool = True) -> str:
+        out = []
+        stack = [(self, prefix, is_last)]
+
+        while stack:
+            node, prefix, is_last = stack.pop()
+            val_str = f": {node.value}" if node.value is not None else ""
+            out.append(
+                f"{prefix}{_CONNECTORS[is_last]}{node.type}{val_str} (id={node.id})\n"
+            )
 
-        # Update prefix for children
-        if is_last:
-            prefix += "   "
-        else:
-            prefix += "│  "
+            # Update prefix for children; push them reversed so they pop in order
+            prefix += _PREFIXES[is_last]
+            children = node.children
+            last_index = len(children) - 1
+            for i in range(last_index, -1, -1):
+                stack.append((children[i], prefix, i == last_index))
 
-        for i, child in enumerate(self.children):
-            last = i == len(self.children) - 1
-            s += child.pretty_print(prefix, last)
-        return s
+        return "".join(out)
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"<ASTNode {self.type} id={self.id}>"
 
 
 # ---------------- Node types ----------------
 class ProgramNode(ASTNode):
+    __slots__ = ()
+
     def __init__(self, globals_node, procs_node, funcs_node, main_node):
         super().__init__(
             "PROGRAM", children=[globals_node, procs_node, funcs_node, main_node]
@@ -42,17 +72,23 @@ class ProgramNode(ASTNode):
 
 
 class VarDeclNode(ASTNode):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__("VAR", value=name)
 
 
 class FuncNode(ASTNode):
+    __slots__ = ("return_type",)
+
     def __init__(self, name, params, body, ret_type):
         super().__init__("FUNC", value=name, children=params + [body])
         self.return_type = ret_type
 
 
 class ProcNode(ASTNode):
+    __slots__ = ()
+
     def __init__(self, name, params, body):
         super().__init__("PROC", value=name, children=params + [body])
 
@@ -60,10 +96,10 @@ class ProcNode(ASTNode):
 class ASTBuilder:
     """Comprehensive AST builder for SPL language"""
 
-    def __init__(self, tokens):
+    def __init__(self, tokens: List[Any]) -> None:
         self.tokens = tokens
-        self.pos = 0
-        self.current_token = self.tokens[0] if tokens else None
+        self.pos: int = 0
+        self.current_token: Optional[Any] = self.tokens[0] if tokens else None
 
     def peek(self, offset=0):
         """Look ahead at tokens"""
@@ -136,13 +172,14 @@ class ASTBuilder:
     def parse_variables(self, node_type="VARS"):
         """Parse variable declarations"""
         vars_node = ASTNode(node_type)
+        var_decls = []
 
         while self.current_token and self.current_token.type == "IDENT":
             var_name = self.current_token.value
-            var_decl = VarDeclNode(var_name)
-            vars_node.add_child(var_decl)
+            var_decls.append(VarDeclNode(var_name))
             self.advance()
 
+        vars_node.children = tuple(var_decls)
         return vars_node
 
     def parse_procdefs(self):
@@ -162,12 +199,11 @@ class ASTBuilder:
         self.expect("LBRACE")
         vars_node = self.parse_variables("VARS")
         self.expect("RBRACE")
-        main_node.add_child(vars_node)
 
         # Parse algorithm
         algo_node = self.parse_algo()
-        main_node.add_child(algo_node)
 
+        main_node.children = (vars_node, algo_node)
         return main_node
 
     def parse_algo(self):
@@ -175,17 +211,16 @@ class ASTBuilder:
         algo_node = ASTNode("ALGO")
 
         # Parse first instruction
-        instr = self.parse_instr()
-        algo_node.add_child(instr)
+        instrs = [self.parse_instr()]
 
         # Parse remaining instructions (INSTR ; ALGO)
         while self.current_token and self.current_token.type == "SEMI":
             self.advance()  # consume semicolon
 
             if self.current_token and self.current_token.type != "RBRACE":
-                instr = self.parse_instr()
-                algo_node.add_child(instr)
+                instrs.append(self.parse_instr())
 
+        algo_node.children = tuple(instrs)
         return algo_node
 
     def parse_instr(self):
@@ -249,47 +284,48 @@ class ASTBuilder:
         return ASTNode("ASSIGN", children=[var_node, term])
 
     def parse_term(self):
-        """Parse TERM (ATOM, unary ops, binary ops)"""
-        if self.current_token.type == "LPAREN":
-            self.advance()  # consume (
-
-            # Check for unary operation
-            if self.current_token.type in ["neg", "not"]:
-                op = self.current_token.value
-                self.advance()
+        """Parse TERM (ATOM, unary ops, binary ops)
+
+        Nested parentheses are handled with an explicit stack of open
+        frames instead of recursion, so deeply nested expressions do not
+        cost one Python call frame per level.
+        """
+        # Each frame is (kind, op, left) for a "(" that is still open
+        frames = []
+
+        while True:
+            # Descend through opening parentheses down to the next ATOM
+            while self.current_token.type == "LPAREN":
+                self.advance()  # consume (
+
+                # Check for unary operation
+                if self.current_token.type in _UNOP_TOKENS:
+                    frames.append(("UNOP", self.current_token.value, None))
+                    self.advance()
+                else:
+                    frames.append(("PAREN", None, None))
 
-                operand = self.parse_term()
-                self.expect("RPAREN")
+            term = self.parse_atom()
 
-                return ASTNode("UNOP", value=op, children=[operand])
+            # Close every frame the finished term completes
+            while frames:
+                kind, op, left = frames[-1]
 
-            # Binary operation: ( TERM BINOP TERM )
-            else:
-                left = self.parse_term()
-
-                if self.current_token.type in [
-                    "eq",
-                    "GT",
-                    "or",
-                    "and",
-                    "plus",
-                    "minus",
-                    "mult",
-                    "div",
-                ]:
-                    op = self.current_token.value
+                if kind == "PAREN" and self.current_token.type in _BINOP_TOKENS:
+                    # Binary operation: ( TERM BINOP TERM ) - parse the right side
+                    frames[-1] = ("BINOP", self.current_token.value, term)
                     self.advance()
+                    break
 
-                    right = self.parse_term()
-                    self.expect("RPAREN")
-
-                    return ASTNode("BINOP", value=op, children=[left, right])
-                else:
-                    self.expect("RPAREN")
-                    return left
+                self.expect("RPAREN")
+                frames.pop()
 
-        # Simple ATOM
-        return self.parse_atom()
+                if kind == "UNOP":
+                    term = ASTNode("UNOP", value=op, children=[term])
+                elif kind == "BINOP":
+                    term = ASTNode("BINOP", value=op, children=[left, term])
+            else:
+                return term
 
     def parse_atom(self):
         """Parse ATOM (VAR or number)"""
@@ -316,8 +352,7 @@ class ASTBuilder:
         body = self.parse_algo()
         self.expect("RBRACE")
 
-        while_node = ASTNode("WHILE", children=[condition, body])
-        return ASTNode("LOOP", children=[while_node])
+        return ASTNode("WHILE", children=[condition, body])
 
     def parse_do_until_loop(self):
         """Parse: do { ALGO } until TERM"""
@@ -331,8 +366,7 @@ class ASTBuilder:
 
         condition = self.parse_term()
 
-        do_node = ASTNode("DO", children=[body, condition])
-        return ASTNode("LOOP", children=[do_node])
+        return ASTNode("DO_UNTIL", children=[body, condition])
 
     def parse_if_statement(self):
         """Parse: if TERM { ALGO } [else { ALGO }]"""
@@ -350,11 +384,9 @@ class ASTBuilder:
             else_body = self.parse_algo()
             self.expect("RBRACE")
 
-            if_node = ASTNode("IF", children=[condition, then_body, else_body])
-        else:
-            if_node = ASTNode("IF", children=[condition, then_body])
+            return ASTNode("IF", children=[condition, then_body, else_body])
 
-        return ASTNode("BRANCH", children=[if_node])
+        return ASTNode("IF", children=[condition, then_body])
 
 
 def build_ast(tokens):
@@ -1,24 +1,27 @@
 # test_integration.py - Integration script for testing your SPL parser
 
 import sys
-import os
+from operator import itemgetter
 
-# Add current directory to path so we can import your modules
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Token types the parser sees by type name; everything else by its value
+_TYPE_PASSTHROUGH = frozenset(("IDENT", "NUMBER", "STRING"))
+
+# Pre-built banners and status labels
+_BANNER80 = "=" * 80
+_RULE80 = "-" * 80
+_RULE40 = "-" * 40
+_SEP_TEST = "\n" + "⏸️ " * 20 + "\n"
+_PASS = "✅ PASS"
+_FAIL = "❌ FAIL"
 
 
 def convert_lexer_token_to_parser_string(token):
     """Convert a lexer Token to a string the parser expects"""
-    # For identifiers, numbers, and strings, use the token type name
-    if token.type == "IDENT":
-        return "IDENT"
-    elif token.type == "NUMBER":
-        return "NUMBER"
-    elif token.type == "STRING":
-        return "STRING"
-    else:
-        # For keywords and symbols, use the actual token value
-        return token.value
+    # For identifiers, numbers, and strings, use the token type name;
+    # for keywords and symbols, use the actual token value
+    t = token.type
+    return t if t in _TYPE_PASSTHROUGH else token.value
 
 
 def parse_spl_source(source_code):
@@ -26,20 +29,20 @@ def parse_spl_source(source_code):
     try:
         # Import your modules
         from lexer import Lexer, LexerError
-        from parser import SLRParser, build_spl_grammar
+        from parser import get_spl_parser
 
         print(f"Input source ({len(source_code)} chars):")
-        print("-" * 40)
+        print(_RULE40)
         print(source_code.strip())
-        print("-" * 40)
+        print(_RULE40)
 
         # Tokenize
         try:
             lexer = Lexer(source_code)
             tokens = list(lexer)
             print(f"\n✅ Lexing successful - {len(tokens)} tokens:")
-            for i, token in enumerate(tokens):
-                print(f"  {i:2d}: {token}")
+            if tokens:
+                print("\n".join(f"  {i:2d}: {t}" for i, t in enumerate(tokens)))
         except LexerError as e:
             print(f"❌ Lexer error: {e}")
             return False
@@ -48,15 +51,12 @@ def parse_spl_source(source_code):
             return False
 
         # Convert to parser format
-        parser_tokens = [
-            convert_lexer_token_to_parser_string(token) for token in tokens
-        ]
+        parser_tokens = list(map(convert_lexer_token_to_parser_string, tokens))
         print(f"\nConverted tokens for parser: {parser_tokens}")
 
         # Parse
         try:
-            grammar = build_spl_grammar()
-            parser = SLRParser(grammar)
+            parser = get_spl_parser()
             print(f"\n🔄 Starting parse...")
 
             result = parser.parse(parser_tokens)
@@ -84,13 +84,13 @@ def parse_spl_source(source_code):
 
 def test_individual_program(name, source_code):
     """Test a single program"""
-    print("=" * 80)
+    print(_BANNER80)
     print(f"TEST: {name}")
-    print("=" * 80)
+    print(_BANNER80)
 
     result = parse_spl_source(source_code)
 
-    print(f"\n🏁 Final result: {'✅ PASS' if result else '❌ FAIL'}")
+    print(f"\n🏁 Final result: {_PASS if result else _FAIL}")
     return result
 
 
@@ -104,33 +104,42 @@ def run_selected_tests():
     all_tests = get_test_programs()
     edge_tests = get_edge_case_tests()
 
-    selected_tests = {
+    main_names = (
         # Basic tests
-        "minimal_program": all_tests["minimal_program"],
-        "simple_variable_program": all_tests["simple_variable_program"],
+        "minimal_program",
+        "simple_variable_program",
         # Expression tests
-        "arithmetic_expressions": all_tests["arithmetic_expressions"],
+        "arithmetic_expressions",
         # Control flow
-        "if_statement": all_tests["if_statement"],
-        "while_loop": all_tests["while_loop"],
+        "if_statement",
+        "while_loop",
         # Procedures and functions
-        "simple_procedure": all_tests["simple_procedure"],
-        "simple_function": all_tests["simple_function"],
+        "simple_procedure",
+        "simple_function",
+    )
+    edge_names = (
         # Edge cases
-        "empty_sections": edge_tests["empty_sections"],
-        "max_parameters": edge_tests["max_parameters"],
-    }
+        "empty_sections",
+        "max_parameters",
+    )
+
+    selected_tests = dict(
+        zip(
+            main_names + edge_names,
+            itemgetter(*main_names)(all_tests) + itemgetter(*edge_names)(edge_tests),
+        )
+    )
 
     results = {}
 
     print("🧪 RUNNING SELECTED SPL PARSER TESTS")
-    print("=" * 80)
+    print(_BANNER80)
 
     for test_name, source_code in selected_tests.items():
         try:
             result = test_individual_program(test_name, source_code)
             results[test_name] = result
-            print("\n" + "⏸️ " * 20 + "\n")  # Separator between tests
+            print(_SEP_TEST)  # Separator between tests
         except KeyboardInterrupt:
             print("\n❌ Test interrupted by user")
             break
@@ -139,18 +148,22 @@ def run_selected_tests():
             results[test_name] = False
 
     # Final summary
-    print("=" * 80)
+    print(_BANNER80)
     print("📊 TEST SUMMARY")
-    print("=" * 80)
+    print(_BANNER80)
 
-    passed = sum(1 for result in results.values() if result)
+    passed = sum(map(bool, results.values()))
     total = len(results)
 
-    for test_name, result in results.items():
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status} {test_name}")
+    if results:
+        print(
+            "\n".join(
+                f"{_PASS if result else _FAIL} {test_name}"
+                for test_name, result in results.items()
+            )
+        )
 
-    print("-" * 80)
+    print(_RULE80)
     print(f"Results: {passed}/{total} passed ({passed/total*100:.1f}%)")
 
     if passed == total:
@@ -190,7 +203,7 @@ def main():
         elif sys.argv[1] == "selected":
             run_selected_tests()
         elif sys.argv[1] == "all":
-            from spl_test_programs import get_test_programs, run_test_suite
+            from spl_test_programs import run_test_suite
 
             run_test_suite(parse_spl_source)
         else:
@@ -206,4 +219,9 @@ def main():
 
 
 if __name__ == "__main__":
+    import os
+
+    # Add current directory to path so we can import your modules
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
     main()
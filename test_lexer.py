@@ -1,18 +1,22 @@
 #Run with pytest -q
 
 from dataclasses import asdict
+from operator import attrgetter
+
+import pytest
 
 from lexer import Lexer, LexerError, TokenType
 
 # Helper: tokenize and return (type, value) pairs for easy assertions
+_tv = attrgetter("type", "value")
+
 def toks(src):
-    return [(t.type, t.value) for t in Lexer(src)]
+    return [*map(_tv, Lexer(src))]
+
+_fmt_token = "{0.type}:{0.value}@{0.line}:{0.col}".format
 
 def print_tokens(src):
-    out = []
-    for t in Lexer(src):
-        out.append(f"{t.type}:{t.value}@{t.line}:{t.col}")
-    return "\n".join(out)
+    return "\n".join(map(_fmt_token, Lexer(src)))
 
 
 #Simple sample test
@@ -92,18 +96,12 @@ def test_identifier_minimal_and_digits():
     ]
 
 def test_identifier_reject_uppercase_start():
-    try:
-        _ = toks("A")
-        assert False, "Expected LexerError for uppercase start"
-    except LexerError as e:
-        assert "Unexpected character" in str(e) or "must start" in str(e)
+    with pytest.raises(LexerError, match="Unexpected character"):
+        toks("A")
 
 def test_identifier_reject_underscore():
-    try:
-        _ = toks("a_")
-        assert False, "Expected LexerError for underscore"
-    except LexerError as e:
-        assert "Unexpected character" in str(e) or "Strings may contain" not in str(e)
+    with pytest.raises(LexerError, match="Unexpected character"):
+        toks("a_")
 
 # Expected:
 # "a z9 a1" -> IDENT:a, IDENT:z9, IDENT:a1
@@ -120,11 +118,8 @@ def test_numbers_ok():
     ]
 
 def test_numbers_reject_leading_zero():
-    try:
-        _ = toks("01")
-        assert False, "Expected LexerError for leading zero"
-    except LexerError as e:
-        assert "leading zeros" in str(e)
+    with pytest.raises(LexerError, match="leading zeros"):
+        toks("01")
 
 # Expected:
 # "0 7 12345" -> NUMBER:0, NUMBER:7, NUMBER:12345
@@ -139,32 +134,20 @@ def test_string_ok_and_limits():
 
 def test_string_too_long():
     s16 = '"abcdefghijklmnop"'  # 16
-    try:
-        _ = toks(s16)
-        assert False, "Expected LexerError for string length > 15"
-    except LexerError as e:
-        assert "exceeds max length" in str(e)
+    with pytest.raises(LexerError, match="exceeds max length"):
+        toks(s16)
 
 def test_string_illegal_char():
-    try:
-        _ = toks('"abc_def"')
-        assert False, "Expected LexerError for underscore in string"
-    except LexerError as e:
-        assert "only letters or digits" in str(e)
+    with pytest.raises(LexerError, match="only letters or digits"):
+        toks('"abc_def"')
 
 def test_string_unterminated():
-    try:
-        _ = toks('"abc')
-        assert False, "Expected LexerError for unterminated string"
-    except LexerError as e:
-        assert "Unterminated string" in str(e)
+    with pytest.raises(LexerError, match="Unterminated string"):
+        toks('"abc')
 
 def test_string_newline_forbidden():
-    try:
-        _ = toks('"ab\nc"')
-        assert False, "Expected LexerError for newline in string"
-    except LexerError as e:
-        assert "cannot span lines" in str(e)
+    with pytest.raises(LexerError, match="cannot span lines"):
+        toks('"ab\nc"')
 
 # Expected:
 # '"abcdefghijklmno"' -> STRING:abcdefghijklmno
@@ -215,13 +198,10 @@ def test_punct_positions_basic():
 
 
 #Unexpected characters
-def test_unexpected_symbols():
-    for bad in ["@", "#", "_", "$"]:
-        try:
-            _ = toks(bad)
-            assert False, f"Expected LexerError for {bad}"
-        except LexerError as e:
-            assert "Unexpected character" in str(e)
+@pytest.mark.parametrize("bad", ["@", "#", "_", "$"])
+def test_unexpected_symbols(bad):
+    with pytest.raises(LexerError, match="Unexpected character"):
+        toks(bad)
 
 # Expected:
 # "@", "#", "_", "$" -> LexerError: Unexpected character ...
@@ -254,11 +234,8 @@ def test_whitespace_only():
 #No space
 def test_adjacent_braces_and_parens():
     src = "(){},{}();"
-    try:
+    with pytest.raises(LexerError, match="Unexpected character"):
         toks(src)
-        assert False, "Expected LexerError for ',' because its not in the lexer"
-    except LexerError as e:
-        assert "Unexpected character" in str(e)
 
 def test_adjacent_without_comma():
     src = "(){}{}();"
@@ -281,11 +258,8 @@ def test_adjacent_without_comma():
 
 def test_ident_uppercase_inside():
     # 'aA' should fail at 'A'
-    try:
+    with pytest.raises(LexerError, match="Unexpected character"):
         toks("aA")
-        assert False, "Expected LexerError for uppercase inside identifier"
-    except LexerError as e:
-        assert "Unexpected character" in str(e)
 
     # ensure keywords are exact match, not just prefixes
     assert toks("print printx and andy not noteq") == [
@@ -305,36 +279,29 @@ def test_ident_uppercase_inside():
         (TokenType.NUMBER.value, "9"),
     ]
 
-def test_number_leading_zero_rejected():
-    for s in ["01", "00", "0123"]:
-        try:
-            toks(s)
-            assert False, f"Expected LexerError for leading zero: {s}"
-        except LexerError as e:
-            assert "leading zeros" in str(e)
+@pytest.mark.parametrize("s", ["01", "00", "0123"])
+def test_number_leading_zero_rejected(s):
+    with pytest.raises(LexerError, match="leading zeros"):
+        toks(s)
 
 #String boundaries
+def test_string_boundaries():
     assert toks('""') == [(TokenType.STRING.value, "")]
     assert toks('"abcdefghijklmno"') == [(TokenType.STRING.value, "abcdefghijklmno")]  # 15
 
-def test_string_too_long_and_illegal_char():
-    for s, msg in [('"abcdefghijklmnop"', "exceeds max length"), 
-                   ('"hello!"', "only letters or digits")]:
-        try:
-            toks(s)
-            assert False, f"Expected LexerError: {s}"
-        except LexerError as e:
-            assert msg in str(e)
-
-def test_string_unterminated_and_newline():
-    for s, msg in [('"abc', "Unterminated string"), ('"ab\nc"', "cannot span lines")]:
-        try:
-            toks(s)
-            assert False, f"Expected LexerError: {s}"
-        except LexerError as e:
-            assert msg in str(e)
+@pytest.mark.parametrize("s,msg", [('"abcdefghijklmnop"', "exceeds max length"),
+                                   ('"hello!"', "only letters or digits")])
+def test_string_too_long_and_illegal_char(s, msg):
+    with pytest.raises(LexerError, match=msg):
+        toks(s)
+
+@pytest.mark.parametrize("s,msg", [('"abc', "Unterminated string"), ('"ab\nc"', "cannot span lines")])
+def test_string_unterminated_and_newline(s, msg):
+    with pytest.raises(LexerError, match=msg):
+        toks(s)
 
 #Operators
+def test_operators_boundaries():
     got = toks("eq and or plus minus mult div neg not >")
     assert got == [
         (TokenType.EQ.value, "eq"),
@@ -351,13 +318,10 @@ def test_string_unterminated_and_newline():
     ]
 
 #Unexpected symbols
-def test_unexpected_symbols_various():
-    for bad in ["@", "#", "_", "$", "'", "`", "\\"]:
-        try:
-            toks(bad)
-            assert False, f"Expected LexerError for {repr(bad)}"
-        except LexerError as e:
-            assert "Unexpected character" in str(e)
+@pytest.mark.parametrize("bad", ["@", "#", "_", "$", "'", "`", "\\"])
+def test_unexpected_symbols_various(bad):
+    with pytest.raises(LexerError, match="Unexpected character"):
+        toks(bad)
 
 #Printing just to double check
 if __name__ == "__main__":
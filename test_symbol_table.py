@@ -0,0 +1,38 @@
+#Run with pytest -q
+
+import pytest
+
+from symbol_table import DuplicateSymbolError, SymbolTable
+
+
+def test_visible_var_names_follow_add_many_that_raises():
+    scope = SymbolTable("global")
+    scope.add("a", "var")
+    assert scope.visible_var_names() == {"a"}
+
+    with pytest.raises(DuplicateSymbolError):
+        scope.add_many([("b", "var", None), ("a", "var", None)])
+
+    # Whatever the batch left behind, the cache must agree with lookup()
+    visible = scope.visible_var_names()
+    for name in ("a", "b"):
+        assert (name in visible) == (scope.lookup(name) is not None)
+
+
+@pytest.mark.parametrize(
+    "batch",
+    [
+        [("b", "var", None), ("a", "var", None)],  # clashes with the scope
+        [("b", "var", None), ("c", "var", None), ("b", "var", None)],  # in-batch
+    ],
+)
+def test_rejected_add_many_leaves_table_unchanged(batch):
+    scope = SymbolTable("global")
+    scope.add("a", "var", node_id=7)
+    before = dict(scope.symbols)
+
+    with pytest.raises(DuplicateSymbolError):
+        scope.add_many(batch)
+
+    assert scope.symbols == before
+    assert scope.visible_var_names() == {"a"}
@@ -1,7 +1,12 @@
-from parser import build_spl_grammar, SLRParser, Token, TokenType
+import os
+
+from parser import get_spl_parser, Token, TokenType
 from syntax_tree import ProgramNode, VarDeclNode, ASTNode, build_ast
 from symbol_table import SymbolTable, build_symbol_table
 
+# Dump the AST / symbol table renderings only when asked (always under __main__)
+_VERBOSE = bool(os.environ.get("SPL_TEST_VERBOSE"))
+
 
 def build_mock_ast():
     """For now, construct a small AST manually (later connect during parsing)."""
@@ -31,36 +36,36 @@ def build_mock_ast():
     return prog
 
 
+# Tokens for: glob { globalVar } proc { } func { } main { var { localVar } localVar = 42; print localVar }
+_TOKENS = (
+    Token(TokenType.GLOB, "glob"),
+    Token(TokenType.LBRACE, "{"),
+    Token(TokenType.IDENT, "globalVar"),
+    Token(TokenType.RBRACE, "}"),
+    Token(TokenType.PROC, "proc"),
+    Token(TokenType.LBRACE, "{"),
+    Token(TokenType.RBRACE, "}"),
+    Token(TokenType.FUNC, "func"),
+    Token(TokenType.LBRACE, "{"),
+    Token(TokenType.RBRACE, "}"),
+    Token(TokenType.MAIN, "main"),
+    Token(TokenType.LBRACE, "{"),
+    Token(TokenType.VAR, "var"),
+    Token(TokenType.LBRACE, "{"),
+    Token(TokenType.IDENT, "localVar"),
+    Token(TokenType.RBRACE, "}"),
+    Token(TokenType.IDENT, "localVar"),
+    Token(TokenType.ASSIGN, "="),
+    Token(TokenType.NUMBER, "42"),
+    Token(TokenType.SEMI, ";"),
+    Token(TokenType.PRINT, "print"),
+    Token(TokenType.IDENT, "localVar"),
+    Token(TokenType.RBRACE, "}"),
+)
+
+
 def test_parser_and_ast():
-    grammar = build_spl_grammar()
-    parser = SLRParser(grammar)
-
-    # Tokens for: glob { globalVar } proc { } func { } main { var { localVar } localVar = 42; print localVar }
-    tokens = [
-        Token(TokenType.GLOB, "glob"),
-        Token(TokenType.LBRACE, "{"),
-        Token(TokenType.IDENT, "globalVar"),
-        Token(TokenType.RBRACE, "}"),
-        Token(TokenType.PROC, "proc"),
-        Token(TokenType.LBRACE, "{"),
-        Token(TokenType.RBRACE, "}"),
-        Token(TokenType.FUNC, "func"),
-        Token(TokenType.LBRACE, "{"),
-        Token(TokenType.RBRACE, "}"),
-        Token(TokenType.MAIN, "main"),
-        Token(TokenType.LBRACE, "{"),
-        Token(TokenType.VAR, "var"),
-        Token(TokenType.LBRACE, "{"),
-        Token(TokenType.IDENT, "localVar"),
-        Token(TokenType.RBRACE, "}"),
-        Token(TokenType.IDENT, "localVar"),
-        Token(TokenType.ASSIGN, "="),
-        Token(TokenType.NUMBER, "42"),
-        Token(TokenType.SEMI, ";"),
-        Token(TokenType.PRINT, "print"),
-        Token(TokenType.IDENT, "localVar"),
-        Token(TokenType.RBRACE, "}"),
-    ]
+    parser = get_spl_parser()
 
     # Show the program as readable SPL source
     print("=== INPUT PROGRAM ===")
@@ -77,19 +82,22 @@ def test_parser_and_ast():
     print(program_text)
 
     print("\n=== PARSER CHECK ===")
-    parse_result = parser.parse_tokens(tokens)
+    parse_result = parser.parse_tokens(_TOKENS)
     print("Parse result:", parse_result)
 
     print("\n=== AST ===")
     # ast = build_mock_ast()
     # ast = build_ast()
-    ast = build_ast(tokens)
-    print(ast.pretty_print())
+    ast = build_ast(_TOKENS)
+    if _VERBOSE:
+        print(ast.pretty_print())
 
     print("\n=== SYMBOL TABLE ===")
     symtab = build_symbol_table(ast)
-    print(symtab.pretty_print())
+    if _VERBOSE:
+        print(symtab.pretty_print())
 
 
 if __name__ == "__main__":
+    _VERBOSE = True
     test_parser_and_ast()
@@ -2,21 +2,38 @@ from symbol_table import SymbolTable
 from syntax_tree import ASTNode, ProgramNode, VarDeclNode
 from type_checker import TypeChecker
 
-try:
-    import pytest  
-except Exception:  
-    pytest = None
-
 
 # helper functions
+
+# Interned leaf nodes keyed by (type, value), shared between test programs.
+# The only thing the type checker writes onto a node is its term_type cache,
+# which depends on the node's subtree alone, so sharing leaves is safe; do not
+# change an interned node's type, value or children.
+_LEAF_CACHE = {}
+
+
 def N(t, val=None, children=None):
-    return ASTNode(t, val, children or [])
+    if children:
+        return ASTNode(t, val, children)
+    key = (t, type(val), val)
+    leaf = _LEAF_CACHE.get(key)
+    if leaf is None:
+        # ASTNode gives leaves its shared empty children tuple
+        leaf = _LEAF_CACHE[key] = ASTNode(t, val)
+    return leaf
+
+
+# One root scope and checker reused by every check; reset() clears them
+# between programs
+_ROOT = SymbolTable("everywhere")
+_CHECKER = TypeChecker(_ROOT)
 
 
 def run_check(program_node):
-    root = SymbolTable("everywhere")
-    checker = TypeChecker(root)
-    report = checker.check_program(program_node)
+    root = _ROOT
+    root.reset()
+    _CHECKER.reset(root)
+    report = _CHECKER.check_program(program_node)
     return report.ok, list(report.errors)
 
 
@@ -31,20 +48,19 @@ def print_report(title, ok, errors):
 
 
 def missing_substrings(errors, expected_substrings):
-    missing = []
-    for sub in expected_substrings:
-        if not any(sub in e for e in errors):
-            missing.append(sub)
-    return missing
+    # One newline-joined blob: expected substrings never contain a newline,
+    # so a hit can't straddle two errors
+    blob = "\n".join(errors)
+    return [sub for sub in expected_substrings if sub not in blob]
 
 
 # Baseline programs 
 def make_ok_program():
     globals_node = N("GLOBALS", children=[VarDeclNode("x")])
-    procs_node = N("PROCS", children=[])
+    procs_node = N("PROCS")
 
     params = [VarDeclNode("a"), VarDeclNode("b")]
-    locals_block = N("LOCALS_BLOCK", children=[])
+    locals_block = N("LOCALS_BLOCK")
     body_algo = N("ALGO", children=[N("PRINT", children=[N("STRING", "ok")])])
     body = N("BODY", children=[locals_block, body_algo])
     func_with_return = N("FUNC", "add", children=params + [body, N("NUMBER", 1)])
@@ -70,14 +86,14 @@ def make_bad_program():
     globals_node = N("GLOBALS", children=[VarDeclNode("p")])
 
     proc_body = N("BODY", children=[
-        N("LOCALS_BLOCK", children=[]),
+        N("LOCALS_BLOCK"),
         N("ALGO", children=[N("PRINT", children=[N("VAR", "q")]), N("HALT")]),
     ])
     bad_proc = N("PROC", "p", children=[VarDeclNode("q"), proc_body])
     procs_node = N("PROCS", children=[bad_proc])
 
     func_body = N("BODY", children=[
-        N("LOCALS_BLOCK", children=[]),
+        N("LOCALS_BLOCK"),
         N("ALGO", children=[N("PRINT", children=[N("STRING", "ok")])]),
     ])
     bad_func = N("FUNC", "sum", children=[
@@ -103,12 +119,10 @@ def make_bad_program():
 
 # ------------- Edge-case builders -------------
 def mk_prog(glob_vars, procs, funcs, main_instrs, main_vars=None):
-    globals_node = N("GLOBALS", children=[VarDeclNode(v) for v in (glob_vars or [])])
-    procs_node = N("PROCS", children=procs or [])
-    funcs_node = N("FUNCS", children=funcs or [])
-    if main_vars is None:
-        main_vars = []
-    main = N("MAIN", children=[N("VARS_BLOCK", children=[VarDeclNode(v) for v in main_vars]),
+    globals_node = N("GLOBALS", children=[VarDeclNode(v) for v in (glob_vars or ())])
+    procs_node = N("PROCS", children=procs)
+    funcs_node = N("FUNCS", children=funcs)
+    main = N("MAIN", children=[N("VARS_BLOCK", children=[VarDeclNode(v) for v in (main_vars or ())]),
                                N("ALGO", children=main_instrs or [N("HALT")])])
     return ProgramNode(globals_node, procs_node, funcs_node, main)
 
@@ -250,7 +264,7 @@ def test_missing_return_and_non_numeric_return():
 
 
 def test_algo_node_required_in_body():
-    bad_body = N("BODY", children=[N("LOCALS_BLOCK", children=[]), N("VAR", "x")])
+    bad_body = N("BODY", children=[N("LOCALS_BLOCK"), N("VAR", "x")])
     bad_proc = N("PROC", "q", children=[bad_body])
     prog = mk_prog([], [bad_proc], [], main_instrs=[N("HALT")])
     ok, errors = run_check(prog)
@@ -286,6 +300,57 @@ def test_call_name_must_be_typeless():
     assert any("procedure/function name 'foo' must be typeless" in e for e in errors)
 
 
+def test_broken_operand_does_not_cascade_operator_errors():
+    # y = (neg q) plus 1 with q undeclared: only the VAR error, no operator errors
+    term = N("BINOP", "plus", children=[
+        N("UNOP", "neg", children=[N("VAR", "q")]),
+        N("NUMBER", 1),
+    ])
+    assign = N("ASSIGN_EXPR", children=[N("VAR", "y"), term])
+    prog = mk_prog([], [], [], main_instrs=[assign, N("HALT")], main_vars=["y"])
+    ok, errors = run_check(prog)
+    print_report("OPERAND ERROR CASCADE (BAD)", ok, errors)
+    assert not ok
+    assert any("undeclared variable 'q'" in e for e in errors)
+    assert not any("Unary 'neg'" in e or "Operator 'plus'" in e for e in errors)
+
+
+def test_shared_terms_are_rechecked_on_every_run():
+    # The same term nodes typed in two programs: errors are reported both times
+    good = N("BINOP", "plus", children=[N("NUMBER", 1), N("NUMBER", 2)])
+    bad = N("BINOP", "plus", children=[good, N("BOOL", True)])
+    for _ in range(2):
+        assign = N("ASSIGN_EXPR", children=[N("VAR", "y"), bad])
+        prog = mk_prog([], [], [], main_instrs=[assign, N("HALT")], main_vars=["y"])
+        ok, errors = run_check(prog)
+        assert not ok
+        assert any("Operator 'plus' requires numeric" in e for e in errors)
+    assert good.term_type is not None and bad.term_type is None
+
+
+def test_max_errors_stops_checking_early():
+    _ROOT.reset()
+    checker = TypeChecker(_ROOT, max_errors=2)
+    report = checker.check_program(make_bad_program())
+    print_report("MAX ERRORS = 2 (BAD)", report.ok, report.errors)
+    assert not report.ok and report.fatal
+    assert len(report.errors) == 2
+    assert checker.scope is _ROOT, "scopes must be unwound after stopping"
+
+
+def test_max_errors_boundary():
+    # A limit of 1 keeps exactly one error; anything lower is rejected
+    _ROOT.reset()
+    report = TypeChecker(_ROOT, max_errors=1).check_program(make_bad_program())
+    assert report.fatal and len(report.errors) == 1
+    for bad_limit in (0, -1):
+        try:
+            TypeChecker(_ROOT, max_errors=bad_limit)
+        except ValueError:
+            continue
+        raise AssertionError(f"max_errors={bad_limit} should raise ValueError")
+
+
 # ------------- GOOD edge-case tests -------------
 def test_good_maxthree_limits_and_no_duplicates():
     # func f(a,b,c) { local {u,v,w} ; return 0 }  -- exactly 3 params and 3 locals
@@ -408,6 +473,18 @@ def test_good_unary_ops_types():
     assert ok, f"Expected pass, got errors: {errors}"
 
 
+def test_good_deeply_nested_term():
+    # m = ((...(1 plus 1) plus 1)...) plus 1, deeper than the recursion limit
+    term = N("NUMBER", 1)
+    for _ in range(3000):
+        term = N("BINOP", "plus", children=[term, N("NUMBER", 1)])
+    instrs = [N("ASSIGN_EXPR", children=[N("VAR", "m"), term]), N("HALT")]
+    prog = mk_prog([], [], [], main_instrs=instrs, main_vars=["m"])
+    ok, errors = run_check(prog)
+    print_report("GOOD: DEEPLY NESTED TERM", ok, errors)
+    assert ok, f"Expected pass, got errors: {errors}"
+
+
 # ------------- __main__ runner -------------
 if __name__ == "__main__":
     tests = [
@@ -424,6 +501,10 @@ if __name__ == "__main__":
         test_algo_node_required_in_body,
         test_assignment_target_undeclared_and_term_type_error,
         test_call_name_must_be_typeless,
+        test_broken_operand_does_not_cascade_operator_errors,
+        test_shared_terms_are_rechecked_on_every_run,
+        test_max_errors_stops_checking_early,
+        test_max_errors_boundary,
         # GOOD edge cases
         test_good_maxthree_limits_and_no_duplicates,
         test_good_if_while_do_with_boolean_conditions,
@@ -432,6 +513,7 @@ if __name__ == "__main__":
         test_good_scoping_and_shadowing,
         test_good_print_numeric_atoms_and_binops,
         test_good_unary_ops_types,
+        test_good_deeply_nested_term,
     ]
     failures = 0
     for t in tests:
@@ -1,416 +1,741 @@
-from typing import Optional, List
+import sys
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from symbol_table import DuplicateSymbolError
+
+if TYPE_CHECKING:
+    from symbol_table import SymbolTable
+    from syntax_tree import ASTNode
 
 
 # Small diagnostics helper
 class TypeErrorReport:
-    def __init__(self) -> None:
-        self.errors: List[str] = []
+    __slots__ = ("_entries", "max_errors", "fatal")
+
+    def __init__(self, max_errors: Optional[int] = None) -> None:
+        if max_errors is not None and max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1 (got {max_errors})")
+        # (message or %-template, args); formatted only when errors are read
+        self._entries: List[Tuple[str, Tuple[Any, ...]]] = []
+        self.max_errors = max_errors
+        # set once max_errors errors are recorded; checking stops early after
+        self.fatal = False
+
+    def add(self, msg: str, *args: Any) -> None:
+        if self.fatal:
+            return
+        entries = self._entries
+        entries.append((msg, args))
+        if self.max_errors is not None and len(entries) >= self.max_errors:
+            self.fatal = True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.fatal = False
+
+    @property
+    def errors(self) -> Tuple[str, ...]:
+        """Formatted messages, in report order.
 
-    def add(self, msg: str) -> None:
-        self.errors.append(msg)
+        A read-only snapshot: record errors with add() and drop them with
+        clear(); the tuple has no append()/clear() to call by mistake.
+        """
+        return tuple(msg % args if args else msg for msg, args in self._entries)
 
     @property
     def ok(self) -> bool:
-        return not self.errors
+        return not self._entries
 
     def __str__(self) -> str:
         if self.ok:
             return "OK"
-        return "Type errors:\n- " + "\n- ".join(self.errors)
+        text = "Type errors:\n- " + "\n- ".join(self.errors)
+        if self.fatal:
+            text += f"\n(stopped after {self.max_errors} errors)"
+        return text
+
 
+# Constants for "types"; type_atom/type_term return a member, or None on error
+# (str-valued, so NUMERIC == "numeric" still holds for older callers)
+class TermType(str, Enum):
+    NUMERIC = "numeric"
+    BOOLEAN = "boolean"
 
-# Constants for "types"
-NUMERIC = "numeric"
-BOOLEAN = "boolean"
+    def __str__(self) -> str:
+        return self.value
+
+
+NUMERIC = TermType.NUMERIC
+BOOLEAN = TermType.BOOLEAN
+
+# Hot node-type names, interned so dispatch can compare by identity
+# (ASTNode interns every node type it is given)
+_VAR = sys.intern("VAR")
+_NUMBER = sys.intern("NUMBER")
+_STRING = sys.intern("STRING")
+_OUTPUT_ATOM = sys.intern("OUTPUT_ATOM")
+_OUTPUT_STRING = sys.intern("OUTPUT_STRING")
+_PRINT = sys.intern("PRINT")
+_ALGO = sys.intern("ALGO")
+_BODY = sys.intern("BODY")
+_RETURN = sys.intern("RETURN")
+_MAIN = sys.intern("MAIN")
+_PROGRAM = sys.intern("PROGRAM")
+_PROC = sys.intern("PROC")
+_FUNC = sys.intern("FUNC")
+_IF = sys.intern("IF")
+_WHILE = sys.intern("WHILE")
+
+# Node-type / operator groups, hashed once instead of scanned per visit
+_BOOL_LITERALS = frozenset(("BOOL", "TRUE", "FALSE"))
+_ATOM_TYPES = frozenset(("VAR", "NUMBER", "OUTPUT_ATOM")) | _BOOL_LITERALS
+# Atoms whose type never depends on the scope they are typed in
+_SCOPE_FREE_ATOMS = frozenset(("NUMBER",)) | _BOOL_LITERALS
+
+# Unary operator -> operand (and result) type
+_UNOP_RULES = {"neg": NUMERIC, "not": BOOLEAN}
+
+# Binary operator -> (operand type, result type)
+_BINOP_RULES = {
+    "plus": (NUMERIC, NUMERIC),
+    "minus": (NUMERIC, NUMERIC),
+    "mult": (NUMERIC, NUMERIC),
+    "div": (NUMERIC, NUMERIC),
+    "and": (BOOLEAN, BOOLEAN),
+    "or": (BOOLEAN, BOOLEAN),
+    ">": (NUMERIC, BOOLEAN),
+    "eq": (NUMERIC, BOOLEAN),
+}
+
+# TERM node type -> type_term evaluator opcode; bare atoms count as terms
+_TERM_ATOM, _TERM_UNOP, _TERM_BINOP, _TERM_WRAPPER = range(4)
+_TERM_OPCODES = {t: _TERM_ATOM for t in _ATOM_TYPES}
+_TERM_OPCODES.update(UNOP=_TERM_UNOP, BINOP=_TERM_BINOP, TERM=_TERM_WRAPPER)
+
+
+class _Ctx:
+    """Error-context path ("main/algo/instr[0]") kept as a parent chain.
+
+    Checks pass these down instead of formatting a longer string at every
+    level; str() joins the path only when an error message is built.
+    """
+
+    __slots__ = ("parent", "suffix", "arg")
+
+    def __init__(self, parent: "_Context", suffix: str, arg: Any = None) -> None:
+        self.parent = parent
+        self.suffix = suffix  # %-template when arg is not None
+        self.arg = arg
 
+    def __str__(self) -> str:
+        parts = []
+        ctx: _Context = self
+        while isinstance(ctx, _Ctx):
+            parts.append(ctx.suffix if ctx.arg is None else ctx.suffix % ctx.arg)
+            ctx = ctx.parent
+        parts.append(ctx)
+        return "".join(reversed(parts))
 
-# Utilities: symbol table adapters
-def _is_typeless(scope, name: str) -> bool:
-    """True if name is NOT present in symbol tables (required for NAME in calls/defs)."""
-    return scope.lookup(name) is None
+
+_Context = Union[str, _Ctx]
+
+# TypeChecker._walk work-list steps: (op, node, ctx)
+_VISIT_INSTR, _VISIT_ALGO, _PUSH_SCOPE, _POP_SCOPE, _CHECK_UNTIL = range(5)
+_WorkItem = Tuple[int, Optional["ASTNode"], Optional[_Context]]
 
 
-def _declare_var(
-    scope, name: str, report: TypeErrorReport, ctx: str, node_id=None
-) -> None:
-    """Declare a numeric variable in the current scope (collect duplicate errors)."""
-    try:
-        scope.add(name, "var", node_id=node_id)
-    except Exception as e:
-        report.add(f"{ctx}: {e}")
+# Error templates reported from more than one site (filled in lazily by
+# TypeErrorReport)
+_ERR_OUTPUT_NUMERIC = "%s: output atom must be numeric"
+_ERR_CALL_TYPELESS = "%s: procedure/function name '%s' must be typeless"
+_ERR_RETURN_NUMERIC = "%s: function return atom must be numeric"
 
+# Memo-table miss marker (None is a valid cached "type error" result)
+_MISS = object()
 
-def _require_var(scope, name: str, report: TypeErrorReport, ctx: str) -> bool:
-    """Ensure name exists and is a variable; return True if OK."""
-    sym = scope.lookup(name)
-    if sym is None:
-        report.add(f"{ctx}: undeclared variable '{name}'")
+
+def _scoped_algo(
+    scope_name: str, algo: "ASTNode", ctx: _Context
+) -> List[_WorkItem]:
+    """Work-list steps that check algo inside a fresh child scope."""
+    return [
+        (_PUSH_SCOPE, None, scope_name),
+        (_VISIT_ALGO, algo, ctx),
+        (_POP_SCOPE, None, None),
+    ]
+
+
+# Utilities: symbol table adapters
+def _is_typeless(scope: "SymbolTable", name: str) -> bool:
+    """True if name is NOT present in symbol tables (required for NAME in calls/defs)."""
+    return scope.lookup_entry(name) is None
+
+
+def _require_var(
+    scope: "SymbolTable",
+    name: str,
+    report: TypeErrorReport,
+    ctx: str,
+    *ctx_args: Any,
+) -> bool:
+    """Ensure name exists and is a variable; return True if OK.
+
+    With ctx_args, ctx is a %-template that is only filled in on error.
+    """
+    if name in scope.visible_var_names():
+        return True
+    entry = scope.lookup_entry(name)
+    if entry is None:
+        report.add(
+            "%s: undeclared variable '%s'",
+            ctx % ctx_args if ctx_args else ctx,
+            name,
+        )
         return False
-    if sym.type != "var":
-        report.add(f"{ctx}: '{name}' is a {sym.type}, not a variable")
+    sym_type = entry[0]
+    if sym_type != "var":
+        report.add(
+            "%s: '%s' is a %s, not a variable",
+            ctx % ctx_args if ctx_args else ctx,
+            name,
+            sym_type,
+        )
         return False
     return True
 
 
 # The Type Checker
 class TypeChecker:
-
-    def __init__(self, root_scope):
-        self.report = TypeErrorReport()
-        self.scopes = [root_scope]  # stack of SymbolTable scopes
+    __slots__ = (
+        "report",
+        "scope",
+        "_root_scope",
+        "_visible_vars",
+        "_atom_types",
+        "_term_types",
+        "_typeless_names",
+        "_instr_handlers",
+    )
+
+    def __init__(
+        self, root_scope: "SymbolTable", max_errors: Optional[int] = None
+    ) -> None:
+        self.report = TypeErrorReport(max_errors)
+        # current scope; the enclosing scopes are reached through .parent
+        self.scope: "SymbolTable" = root_scope
+        self._root_scope = root_scope
+        # self.scope.visible_var_names(), refreshed whenever the scope or its
+        # declarations change so VAR checks are a single set lookup
+        self._visible_vars: FrozenSet[str] = root_scope.visible_var_names()
+        # (node id, scope) -> inferred type; VAR typing depends on the scope
+        self._atom_types: Dict[Tuple[int, "SymbolTable"], Optional[TermType]] = {}
+        self._term_types: Dict[Tuple[int, "SymbolTable"], Optional[TermType]] = {}
+        # (name, scope) -> _is_typeless result; dropped on every declaration
+        self._typeless_names: Dict[Tuple[str, "SymbolTable"], bool] = {}
+        # instruction node type -> bound handler, built once per checker
+        self._instr_handlers: Dict[
+            str, Callable[["ASTNode", _Context], Optional[List[_WorkItem]]]
+        ] = {
+            "HALT": self._check_halt,
+            "PRINT": self._check_print,
+            "CALL": self._check_call,
+            "ASSIGN_CALL": self._check_assign_call,
+            "ASSIGN_EXPR": self._check_assign,
+            "ASSIGN": self._check_assign,
+            "IF": self._check_if,
+            "WHILE": self._check_while,
+            "DO_UNTIL": self._check_do_until,
+            "LOOP": self._check_loop,
+            "BRANCH": self._check_branch,
+            "RETURN": self._check_return,
+        }
+
+    def reset(self, root_scope: "SymbolTable") -> None:
+        """Prepare this checker for another check_program() against root_scope.
+
+        The dispatch tables are kept; the report is cleared in place, so a
+        report returned by an earlier run is emptied too.
+        """
+        self.report.clear()
+        self.scope = root_scope
+        self._root_scope = root_scope
+        self._visible_vars = root_scope.visible_var_names()
+        self._atom_types.clear()
+        self._term_types.clear()
+        self._typeless_names.clear()
 
     # ----- scope helpers -----
     @property
-    def scope(self):
-        return self.scopes[-1]
-
-    def push_scope(self, name: str):
-        child = self.scope.create_child_scope(name)
-        self.scopes.append(child)
-
-    def pop_scope(self):
-        self.scopes.pop()
+    def scopes(self) -> Tuple["SymbolTable", ...]:
+        """Open scopes from the root scope to the current one (read-only)."""
+        chain = []
+        scope: Optional["SymbolTable"] = self.scope
+        while scope is not None:
+            chain.append(scope)
+            if scope is self._root_scope:
+                break
+            scope = scope.parent
+        return tuple(reversed(chain))
+
+    def push_scope(self, name: str) -> None:
+        scope = self.scope = self.scope.create_child_scope(name)
+        self._visible_vars = scope.visible_var_names()
+
+    def pop_scope(self) -> None:
+        scope = self.scope = self.scope.parent
+        self._visible_vars = scope.visible_var_names()
+
+    def _is_typeless(self, name: str) -> bool:
+        """Cached _is_typeless() for name in the current scope chain."""
+        key = (name, self.scope)
+        result = self._typeless_names.get(key)
+        if result is None:
+            result = self._typeless_names[key] = _is_typeless(key[1], name)
+        return result
 
     # ----- ATOM & TERM typing -----
-    def type_atom(self, node) -> Optional[str]:
+    # Each (node, scope) pair is typed once; a re-visit returns the recorded
+    # result without re-walking the subtree or re-reporting its errors.
+    def type_atom(self, node: "ASTNode") -> Optional[TermType]:
+        # The common atoms are numeric with no error to remember: skip the memo
+        t = node.type
+        if t is _NUMBER or (t is _VAR and node.value in self._visible_vars):
+            return NUMERIC
+        key = (node.id, self.scope)
+        result = self._atom_types.get(key, _MISS)
+        if result is _MISS:
+            result = self._atom_types[key] = self._type_atom(node)
+        return result
+
+    def type_term(self, root: "ASTNode") -> Optional[TermType]:
+        # Post-order walk on an explicit stack: a node is pushed once to
+        # expand its operands, then again (reduce=True) to combine their
+        # types, which are popped off `values`.
+        # A well-typed term with no VAR in it has the same type in every
+        # scope and run, so it is cached on the node (node.term_type);
+        # everything else goes in the per-run (node id, scope) memo.
+        scope = self.scope
+        memo = self._term_types
+        get_opcode = _TERM_OPCODES.get
+        type_atom = self.type_atom
+        type_unop = self._type_unop
+        type_binop = self._type_binop
+        values: List[Optional[TermType]] = []
+        stack: List[Tuple["ASTNode", bool]] = [(root, False)]
+        pop = stack.pop
+        push = stack.append
+        pop_value = values.pop
+        push_value = values.append
+        while stack:
+            node, reduce = pop()
+            if reduce:
+                opcode = get_opcode(node.type)
+                kids = node.children
+                if opcode == _TERM_BINOP:
+                    rt = pop_value()
+                    result = type_binop(node, pop_value(), rt)
+                    scope_free = (
+                        kids[0].term_type is not None
+                        and kids[1].term_type is not None
+                    )
+                else:
+                    if opcode == _TERM_UNOP:
+                        result = type_unop(node, pop_value())
+                    else:  # pass-through wrapper
+                        result = pop_value()
+                    scope_free = kids[0].term_type is not None
+            else:
+                result = node.term_type
+                if result is not None:
+                    push_value(result)
+                    continue
+                result = memo.get((node.id, scope), _MISS)
+                if result is not _MISS:
+                    push_value(result)
+                    continue
+                opcode = get_opcode(node.type)
+                if opcode == _TERM_ATOM:
+                    result = type_atom(node)
+                    scope_free = node.type in _SCOPE_FREE_ATOMS
+                elif opcode == _TERM_BINOP:
+                    kids = node.children
+                    push((node, True))
+                    push((kids[1], False))
+                    push((kids[0], False))
+                    continue
+                elif opcode == _TERM_UNOP or (
+                    opcode == _TERM_WRAPPER and node.children
+                ):
+                    push((node, True))
+                    push((node.children[0], False))
+                    continue
+                else:
+                    self.report.add(
+                        "Unknown TERM node '%s' at id=%s", node.type, node.id
+                    )
+                    result = None
+                    scope_free = False
+            if scope_free and result is not None:
+                node.term_type = result
+            else:
+                memo[(node.id, scope)] = result
+            push_value(result)
+        return values[0]
+
+    def _type_atom(self, node: "ASTNode") -> Optional[TermType]:
         t = node.type
-        if t == "VAR":
-            ok = _require_var(self.scope, node.value, self.report, f"VAR(id={node.id})")
+        if t is _VAR:
+            ok = _require_var(
+                self.scope, node.value, self.report, "VAR(id=%s)", node.id
+            )
             return NUMERIC if ok else None
-        if t == "NUMBER":
+        if t is _NUMBER:
             return NUMERIC
-        if t in ("BOOL", "TRUE", "FALSE"):
+        if t in _BOOL_LITERALS:
             # defensively allow different boolean literal spellings
             return BOOLEAN
-        if t == "OUTPUT_ATOM":
+        if t is _OUTPUT_ATOM:
             return self.type_atom(node.children[0])
-        if t == "STRING":
+        if t is _STRING:
             # strings are only valid when printed; not an ATOM in expressions
-            self.report.add(f"STRING used where ATOM expected (id={node.id})")
+            self.report.add("STRING used where ATOM expected (id=%s)", node.id)
             return None
-        self.report.add(f"Unknown ATOM node '{t}' at id={node.id}")
+        self.report.add("Unknown ATOM node '%s' at id=%s", t, node.id)
         return None
 
-    def type_term(self, node) -> Optional[str]:
-        t = node.type
-
-        # Bare atoms count as terms
-        if t in ("VAR", "NUMBER", "BOOL", "TRUE", "FALSE", "OUTPUT_ATOM"):
-            return self.type_atom(node)
-
-        if t == "UNOP":
-            op = node.value
-            rhs_t = self.type_term(node.children[0])
-            if op == "neg":
-                if rhs_t == NUMERIC:
-                    return NUMERIC
-                self.report.add(f"Unary 'neg' expects numeric (id={node.id})")
-                return None
-            if op == "not":
-                if rhs_t == BOOLEAN:
-                    return BOOLEAN
-                self.report.add(f"Unary 'not' expects boolean (id={node.id})")
-                return None
-            self.report.add(f"Unknown UNOP '{op}' (id={node.id})")
+    def _type_unop(
+        self, node: "ASTNode", rhs_t: Optional[TermType]
+    ) -> Optional[TermType]:
+        op = node.value
+        operand_t = _UNOP_RULES.get(op)
+        if operand_t is None:
+            self.report.add("Unknown UNOP '%s' (id=%s)", op, node.id)
             return None
-
-        if t == "BINOP":
-            op = node.value
-            lt = self.type_term(node.children[0])
-            rt = self.type_term(node.children[1])
-            if op in ("plus", "minus", "mult", "div"):
-                if lt == NUMERIC and rt == NUMERIC:
-                    return NUMERIC
-                self.report.add(
-                    f"Operator '{op}' requires numeric operands (id={node.id})"
-                )
-                return None
-            if op in ("and", "or"):
-                if lt == BOOLEAN and rt == BOOLEAN:
-                    return BOOLEAN
-                self.report.add(
-                    f"Operator '{op}' requires boolean operands (id={node.id})"
-                )
-                return None
-            if op in (">", "eq"):
-                if lt == NUMERIC and rt == NUMERIC:
-                    return BOOLEAN
-                self.report.add(
-                    f"Operator '{op}' requires numeric operands (id={node.id})"
-                )
-                return None
-            self.report.add(f"Unknown BINOP '{op}' (id={node.id})")
+        if rhs_t is operand_t:
+            return operand_t
+        if rhs_t is None:
+            # operand already reported its own error; don't cascade
             return None
+        self.report.add("Unary '%s' expects %s (id=%s)", op, operand_t, node.id)
+        return None
 
-        if t == "TERM" and node.children:
-            # pass-through wrapper
-            return self.type_term(node.children[0])
-
-        self.report.add(f"Unknown TERM node '{t}' at id={node.id}")
+    def _type_binop(
+        self, node: "ASTNode", lt: Optional[TermType], rt: Optional[TermType]
+    ) -> Optional[TermType]:
+        op = node.value
+        rule = _BINOP_RULES.get(op)
+        if rule is None:
+            self.report.add("Unknown BINOP '%s' (id=%s)", op, node.id)
+            return None
+        operand_t, result_t = rule
+        if lt is operand_t and rt is operand_t:
+            return result_t
+        if lt is None or rt is None:
+            # an operand already reported its own error; don't cascade
+            return None
+        self.report.add(
+            "Operator '%s' requires %s operands (id=%s)", op, operand_t, node.id
+        )
         return None
 
     # output and input functions
-    def check_output(self, node, ctx: str):
+    def check_output(self, node: "ASTNode", ctx: _Context) -> None:
         # Either PRINT STRING, or PRINT ATOM (numeric)
         t = node.type
-        if t == "OUTPUT_STRING" or t == "STRING":
+        if t is _OUTPUT_STRING or t is _STRING:
             return
-        if t == "OUTPUT_ATOM":
-            if self.type_atom(node.children[0]) != NUMERIC:
-                self.report.add(f"{ctx}: output atom must be numeric")
+        if t is _OUTPUT_ATOM:
+            if self.type_atom(node.children[0]) is not NUMERIC:
+                self.report.add(_ERR_OUTPUT_NUMERIC, ctx)
             return
-        if t in ("VAR", "NUMBER"):
-            if self.type_atom(node) != NUMERIC:
-                self.report.add(f"{ctx}: output atom must be numeric")
+        if t is _VAR or t is _NUMBER:
+            if self.type_atom(node) is not NUMERIC:
+                self.report.add(_ERR_OUTPUT_NUMERIC, ctx)
             return
-        if t == "PRINT":
+        if t is _PRINT:
             self.check_output(node.children[0], ctx)
             return
-        self.report.add(f"{ctx}: unknown OUTPUT node '{t}'")
+        self.report.add("%s: unknown OUTPUT node '%s'", ctx, t)
 
-    def check_input(self, node, ctx: str):
+    def check_input(self, node: "ASTNode", ctx: _Context) -> None:
         # INPUT: children are ATOMs (0..3), all numeric
-        if node.type == "INPUT":
-            atoms = node.children
-        else:
-            # Be permissive if the caller passed just a node that wraps the atoms list
-            atoms = node.children
+        # (a non-INPUT node that wraps the atoms list is accepted as well)
+        atoms = node.children
+        add_error = self.report.add
 
         if len(atoms) > 3:
-            self.report.add(f"{ctx}: at most 3 input atoms allowed (got {len(atoms)})")
+            add_error("%s: at most 3 input atoms allowed (got %s)", ctx, len(atoms))
 
+        type_atom = self.type_atom
         for a in atoms:
-            if self.type_atom(a) != NUMERIC:
-                self.report.add(f"{ctx}: input atoms must be numeric")
+            # NUMBER literals are numeric with no lookup or error to record
+            if a.type is not _NUMBER and type_atom(a) is not NUMERIC:
+                add_error("%s: input atoms must be numeric", ctx)
 
     # instr and algo functions
-    def check_instr(self, node, ctx: str):
-        t = node.type
-
-        if t == "HALT":
-            return
-
-        if t == "PRINT":
-            # children[0] = STRING or ATOM
-            if node.children:
-                child = node.children[0]
-                # Handle VAR nodes in print statements
-                if child.type == "VAR":
-                    if not _require_var(
-                        self.scope, child.value, self.report, f"{ctx}/print"
-                    ):
-                        return
-                else:
-                    self.check_output(child, f"{ctx}/print")
-            else:
-                self.report.add(f"{ctx}: PRINT has no expression to print")
-            return
-
-        if t == "CALL":  # value = NAME, children = [INPUT]
-            name = node.value
-            if not _is_typeless(self.scope, name):
-                self.report.add(
-                    f"{ctx}: procedure/function name '{name}' must be typeless"
-                )
-            if node.children:
-                self.check_input(node.children[0], f"{ctx}/call-input")
-            return
-
-        if t == "ASSIGN_CALL":  # value = NAME, children = [VAR, INPUT]
-            name = node.value
-            var_node = node.children[0]
-            input_node = node.children[1]
-            if not _is_typeless(self.scope, name):
-                self.report.add(
-                    f"{ctx}: procedure/function name '{name}' must be typeless"
-                )
-            self.check_input(input_node, f"{ctx}/assign-call-input")
-            if var_node.type != "VAR" or not _require_var(
-                self.scope, var_node.value, self.report, f"{ctx}/target"
-            ):
-                return
-            return
-
-        if t == "ASSIGN_EXPR":  # children = [VAR, TERM]
-            var_node = node.children[0]
-            term_node = node.children[1]
-            if self.type_term(term_node) != NUMERIC:
-                self.report.add(f"{ctx}: right-hand side of assignment must be numeric")
-            if var_node.type != "VAR" or not _require_var(
-                self.scope, var_node.value, self.report, f"{ctx}/target"
-            ):
-                return
-            return
-
-        if t == "ASSIGN":  # Our AST creates ASSIGN nodes - children = [VAR, TERM]
-            var_node = node.children[0]
-            term_node = node.children[1]
-            if self.type_term(term_node) != NUMERIC:
-                self.report.add(f"{ctx}: right-hand side of assignment must be numeric")
-            if var_node.type != "VAR" or not _require_var(
-                self.scope, var_node.value, self.report, f"{ctx}/target"
-            ):
-                return
-            return
-
-        if t == "IF":
-            cond = node.children[0]
-            then_algo = node.children[1]
-            else_algo = node.children[2] if len(node.children) > 2 else None
-            if self.type_term(cond) != BOOLEAN:
-                self.report.add(f"{ctx}: if condition must be boolean")
-            self.push_scope("then")
-            self.check_algo(then_algo, f"{ctx}/then")
-            self.pop_scope()
-            if else_algo is not None:
-                self.push_scope("else")
-                self.check_algo(else_algo, f"{ctx}/else")
-                self.pop_scope()
-            return
-
-        if t == "WHILE":
-            cond = node.children[0]
-            body_algo = node.children[1]
-            if self.type_term(cond) != BOOLEAN:
-                self.report.add(f"{ctx}: while condition must be boolean")
-            self.push_scope("while")
-            self.check_algo(body_algo, f"{ctx}/while-body")
-            self.pop_scope()
-            return
-
-        if t == "DO_UNTIL":
-            body_algo = node.children[0]
-            cond = node.children[1]
-            self.push_scope("do")
-            self.check_algo(body_algo, f"{ctx}/do-body")
-            self.pop_scope()
-            if self.type_term(cond) != BOOLEAN:
-                self.report.add(f"{ctx}: do-until condition must be boolean")
-            return
-
-        if t == "LOOP":
-            # Handle LOOP nodes containing WHILE
-            if node.children and node.children[0].type == "WHILE":
-                while_node = node.children[0]
-                cond = while_node.children[0]
-                body_algo = while_node.children[1]
-                if self.type_term(cond) != BOOLEAN:
-                    self.report.add(f"{ctx}: while condition must be boolean")
-                self.push_scope("while")
-                self.check_algo(body_algo, f"{ctx}/while-body")
-                self.pop_scope()
-            else:
-                self.report.add(f"{ctx}: unknown LOOP structure")
-            return
-
-        if t == "BRANCH":
-            # Handle BRANCH nodes containing IF
-            if node.children and node.children[0].type == "IF":
-                if_node = node.children[0]
-                cond = if_node.children[0]
-                then_algo = if_node.children[1]
-                else_algo = if_node.children[2] if len(if_node.children) > 2 else None
-                if self.type_term(cond) != BOOLEAN:
-                    self.report.add(f"{ctx}: if condition must be boolean")
-                self.push_scope("then")
-                self.check_algo(then_algo, f"{ctx}/then")
-                self.pop_scope()
-                if else_algo is not None:
-                    self.push_scope("else")
-                    self.check_algo(else_algo, f"{ctx}/else")
-                    self.pop_scope()
+    # Nested ALGOs are walked from an explicit work-list instead of by
+    # check_algo/check_instr recursion. Control-flow handlers return the
+    # follow-up steps (scope push/pop, body ALGOs, trailing condition checks)
+    # in execution order; leaf handlers return None.
+    def check_instr(self, node: "ASTNode", ctx: _Context) -> None:
+        self._walk([(_VISIT_INSTR, node, ctx)])
+
+    def check_algo(self, node: "ASTNode", ctx: _Context) -> None:
+        self._walk([(_VISIT_ALGO, node, ctx)])
+
+    def _walk(self, stack: List[_WorkItem]) -> None:
+        # Loop-invariant lookups bound once for the whole walk
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        get_handler = self._instr_handlers.get
+        push_scope = self.push_scope
+        pop_scope = self.pop_scope
+        type_term = self.type_term
+        report = self.report
+        add_error = report.add
+        while stack:
+            op, node, ctx = pop()
+            if report.fatal and op != _PUSH_SCOPE and op != _POP_SCOPE:
+                # error limit hit: only unwind the scopes still on the stack
+                continue
+            if op == _VISIT_INSTR:
+                handler = get_handler(node.type)
+                if handler is None:
+                    add_error("%s: unknown instruction '%s'", ctx, node.type)
+                    continue
+                follow_up = handler(node, ctx)
+                if follow_up:
+                    extend(reversed(follow_up))
+            elif op == _VISIT_ALGO:
+                # Must be an ALGO node containing >=1 instruction
+                if node.type is not _ALGO:
+                    add_error("%s: expected ALGO node, got %s", ctx, node.type)
+                    continue
+                instrs = node.children
+                if not instrs:
+                    add_error("%s: ALGO must contain at least one instruction", ctx)
+                    continue
+                for i in range(len(instrs) - 1, -1, -1):
+                    push((_VISIT_INSTR, instrs[i], _Ctx(ctx, "/instr[%d]", i)))
+            elif op == _PUSH_SCOPE:
+                push_scope(ctx)
+            elif op == _POP_SCOPE:
+                pop_scope()
+            else:  # _CHECK_UNTIL: node is the do-until condition
+                if type_term(node) is not BOOLEAN:
+                    add_error("%s: do-until condition must be boolean", ctx)
+
+    def _check_halt(self, node: "ASTNode", ctx: _Context) -> None:
+        return
+
+    def _check_print(self, node: "ASTNode", ctx: _Context) -> None:
+        # children[0] = STRING or ATOM
+        kids = node.children
+        if kids:
+            child = kids[0]
+            # Handle VAR nodes in print statements
+            if child.type is _VAR:
+                if child.value not in self._visible_vars:
+                    _require_var(
+                        self.scope, child.value, self.report, "%s/print", ctx
+                    )
             else:
-                self.report.add(f"{ctx}: unknown BRANCH structure")
-            return
-
-        if t == "RETURN":
-            # Only valid inside FUNC bodies (presence validated elsewhere).
-            if self.type_atom(node.children[0]) != NUMERIC:
-                self.report.add(f"{ctx}: function return atom must be numeric")
-            return
-
-        self.report.add(f"{ctx}: unknown instruction '{t}'")
-
-    def check_algo(self, node, ctx: str):
-        # Must be an ALGO node containing >=1 instruction
-        if node.type != "ALGO":
-            self.report.add(f"{ctx}: expected ALGO node, got {node.type}")
-            return
+                self.check_output(child, _Ctx(ctx, "/print"))
+        else:
+            self.report.add("%s: PRINT has no expression to print", ctx)
+
+    def _check_call(self, node: "ASTNode", ctx: _Context) -> None:
+        # value = NAME, children = [INPUT]
+        name = node.value
+        if not self._is_typeless(name):
+            self.report.add(_ERR_CALL_TYPELESS, ctx, name)
+        if node.children:
+            self.check_input(node.children[0], _Ctx(ctx, "/call-input"))
+
+    def _check_assign_call(self, node: "ASTNode", ctx: _Context) -> None:
+        # value = NAME, children = [VAR, INPUT]
+        name = node.value
+        kids = node.children
+        var_node = kids[0]
+        input_node = kids[1]
+        if not self._is_typeless(name):
+            self.report.add(_ERR_CALL_TYPELESS, ctx, name)
+        self.check_input(input_node, _Ctx(ctx, "/assign-call-input"))
+        if var_node.type is _VAR and var_node.value not in self._visible_vars:
+            _require_var(self.scope, var_node.value, self.report, "%s/target", ctx)
+
+    def _check_assign(self, node: "ASTNode", ctx: _Context) -> None:
+        # ASSIGN_EXPR / ASSIGN (what our AST creates): children = [VAR, TERM]
+        kids = node.children
+        var_node = kids[0]
+        term_node = kids[1]
+        t = term_node.type
+        # Bare NUMBER / declared VAR right-hand sides are numeric as they stand;
+        # anything else (including an undeclared VAR) goes through type_term
+        if not (
+            t is _NUMBER or (t is _VAR and term_node.value in self._visible_vars)
+        ) and self.type_term(term_node) is not NUMERIC:
+            self.report.add("%s: right-hand side of assignment must be numeric", ctx)
+        if var_node.type is _VAR and var_node.value not in self._visible_vars:
+            _require_var(self.scope, var_node.value, self.report, "%s/target", ctx)
+
+    def _check_if(self, node: "ASTNode", ctx: _Context) -> List[_WorkItem]:
+        kids = node.children
+        cond = kids[0]
+        then_algo = kids[1]
+        if self.type_term(cond) is not BOOLEAN:
+            self.report.add("%s: if condition must be boolean", ctx)
+        steps = _scoped_algo("then", then_algo, _Ctx(ctx, "/then"))
+        if len(kids) > 2:  # IF nodes only carry an else ALGO when one was written
+            steps += _scoped_algo("else", kids[2], _Ctx(ctx, "/else"))
+        return steps
+
+    def _check_while(self, node: "ASTNode", ctx: _Context) -> List[_WorkItem]:
+        kids = node.children
+        cond = kids[0]
+        body_algo = kids[1]
+        if self.type_term(cond) is not BOOLEAN:
+            self.report.add("%s: while condition must be boolean", ctx)
+        return _scoped_algo("while", body_algo, _Ctx(ctx, "/while-body"))
+
+    def _check_do_until(self, node: "ASTNode", ctx: _Context) -> List[_WorkItem]:
+        kids = node.children
+        body_algo = kids[0]
+        cond = kids[1]
+        steps = _scoped_algo("do", body_algo, _Ctx(ctx, "/do-body"))
+        steps.append((_CHECK_UNTIL, cond, ctx))
+        return steps
+
+    def _check_loop(self, node: "ASTNode", ctx: _Context) -> Optional[List[_WorkItem]]:
+        # Handle LOOP nodes containing WHILE
+        if node.children and node.children[0].type is _WHILE:
+            return self._check_while(node.children[0], ctx)
+        self.report.add("%s: unknown LOOP structure", ctx)
+        return None
 
-        if not node.children:
-            self.report.add(f"{ctx}: ALGO must contain at least one instruction")
-            return
+    def _check_branch(
+        self, node: "ASTNode", ctx: _Context
+    ) -> Optional[List[_WorkItem]]:
+        # Handle BRANCH nodes containing IF
+        if node.children and node.children[0].type is _IF:
+            return self._check_if(node.children[0], ctx)
+        self.report.add("%s: unknown BRANCH structure", ctx)
+        return None
 
-        for i, instr in enumerate(node.children):
-            self.check_instr(instr, f"{ctx}/instr[{i}]")
+    def _check_return(self, node: "ASTNode", ctx: _Context) -> None:
+        # Only valid inside FUNC bodies (presence validated elsewhere).
+        if self.type_atom(node.children[0]) is not NUMERIC:
+            self.report.add(_ERR_RETURN_NUMERIC, ctx)
 
     # decl and body functions
-    def check_maxthree_vars(self, var_nodes, ctx: str):
+    def check_maxthree_vars(
+        self, var_nodes: Sequence["ASTNode"], ctx: _Context
+    ) -> None:
         # var_nodes: list of VAR decls (0..3)
         if len(var_nodes) > 3:
             self.report.add(
-                f"{ctx}: at most 3 variables allowed (got {len(var_nodes)})"
+                "%s: at most 3 variables allowed (got %s)", ctx, len(var_nodes)
             )
-        seen = set()
-        for vn in var_nodes:
-            if vn.type != "VAR":
-                self.report.add(f"{ctx}: expected VAR declaration node, got {vn.type}")
-                continue
-            name = vn.value
-            if name in seen:
-                self.report.add(
-                    f"{ctx}: duplicate variable '{name}' in declaration list"
-                )
-            seen.add(name)
-            _declare_var(self.scope, name, self.report, ctx, node_id=vn.id)
+        self._declare_var_nodes(var_nodes, ctx, "declaration list")
 
-    def check_variables_block(self, var_nodes, ctx: str):
+    def check_variables_block(
+        self, var_nodes: Sequence["ASTNode"], ctx: _Context
+    ) -> None:
         # Arbitrary number of VAR decls in current scope
-        seen = set()
+        self._declare_var_nodes(var_nodes, ctx, "same block")
+
+    def _declare_var_nodes(
+        self, var_nodes: Sequence["ASTNode"], ctx: _Context, duplicate_in: str
+    ) -> None:
+        """Shape-check and declare VAR nodes in the current scope in one pass.
+
+        Each list is declared into a freshly pushed scope, so the symbol
+        table's own duplicate check finds the repeats.
+        """
+        scope = self.scope
+        self._typeless_names.clear()
+        names = [vn.value for vn in var_nodes if vn.type is _VAR]
+        try:
+            # all VAR, no repeats and nothing already in scope: one bulk insert
+            batch = len(names) == len(var_nodes) == len(
+                set(names).difference(scope.symbols)
+            )
+        except TypeError:  # unhashable name; reported by the per-node path
+            batch = False
+        if batch:
+            scope.add_many((vn.value, "var", vn.id) for vn in var_nodes)
+            self._visible_vars = scope.visible_var_names()
+            return
+
+        add_error = self.report.add
+        declare = scope.add
         for vn in var_nodes:
-            if vn.type != "VAR":
-                self.report.add(f"{ctx}: expected VAR declaration node, got {vn.type}")
+            if vn.type is not _VAR:
+                add_error("%s: expected VAR declaration node, got %s", ctx, vn.type)
                 continue
-            name = vn.value
-            if name in seen:
-                self.report.add(f"{ctx}: duplicate variable '{name}' in same block")
-            seen.add(name)
-            _declare_var(self.scope, name, self.report, ctx, node_id=vn.id)
+            try:
+                declare(vn.value, "var", node_id=vn.id)
+            except DuplicateSymbolError as e:
+                add_error(
+                    "%s: duplicate variable '%s' in %s", ctx, vn.value, duplicate_in
+                )
+                add_error("%s: %s", ctx, e)
+            except Exception as e:
+                add_error("%s: %s", ctx, e)
+        self._visible_vars = scope.visible_var_names()
 
-    def check_body(self, body_node, ctx: str):
+    def check_body(self, body_node: "ASTNode", ctx: _Context) -> None:
         # BODY children = [LOCALS_BLOCK, ALGO]
-        if body_node.type != "BODY" or len(body_node.children) < 2:
-            self.report.add(f"{ctx}: malformed BODY")
+        kids = body_node.children
+        if body_node.type is not _BODY or len(kids) < 2:
+            self.report.add("%s: malformed BODY", ctx)
             return
-        locals_block = body_node.children[0]
-        algo = body_node.children[1]
+        locals_block = kids[0]
+        algo = kids[1]
         local_vars = locals_block.children  # list of VAR nodes
 
         self.push_scope("body")
-        self.check_maxthree_vars(local_vars, f"{ctx}/locals")
-        self.check_algo(algo, f"{ctx}/algo")
+        self.check_maxthree_vars(local_vars, _Ctx(ctx, "/locals"))
+        self.check_algo(algo, _Ctx(ctx, "/algo"))
         self.pop_scope()
 
     #  PROC / FUNC / MAIN / PROGRAM functions
-    def check_proc(self, proc_node, ctx: str):
+    def check_proc(self, proc_node: "ASTNode", ctx: _Context) -> None:
         # PROC: value=name, children = [PARAM(=VAR), ..., BODY]
         name = proc_node.value
-        if not _is_typeless(self.scope, name):
-            self.report.add(f"{ctx}: procedure name '{name}' must be typeless")
-        if not proc_node.children:
-            self.report.add(f"{ctx}: malformed PROC (missing children)")
+        if not self._is_typeless(name):
+            self.report.add("%s: procedure name '%s' must be typeless", ctx, name)
+        kids = proc_node.children
+        if not kids:
+            self.report.add("%s: malformed PROC (missing children)", ctx)
             return
 
-        params = proc_node.children[:-1]
-        body = proc_node.children[-1]
+        params = kids[:-1]
+        body = kids[-1]
 
         self.push_scope(f"proc {name}")
-        self.check_maxthree_vars(params, f"{ctx}/params")
-        self.check_body(body, f"{ctx}/body")
+        self.check_maxthree_vars(params, _Ctx(ctx, "/params"))
+        self.check_body(body, _Ctx(ctx, "/body"))
         self.pop_scope()
 
     def _check_func_return_presence(
-        self, body_node, explicit_return_atom_node, ctx: str
+        self,
+        body_node: "ASTNode",
+        explicit_return_atom_node: Optional["ASTNode"],
+        ctx: _Context,
     ) -> None:
         """
         Accept either:
@@ -420,76 +745,87 @@ class TypeChecker:
         If both are present, both must be numeric.
         """
         if explicit_return_atom_node is not None:
-            if self.type_atom(explicit_return_atom_node) != NUMERIC:
-                self.report.add(f"{ctx}: function return atom must be numeric")
+            if self.type_atom(explicit_return_atom_node) is not NUMERIC:
+                self.report.add(_ERR_RETURN_NUMERIC, ctx)
 
         had_return_instr = False
-        if body_node.type == "BODY" and len(body_node.children) >= 2:
-            algo = body_node.children[1]
-            if algo.children:
-                last = algo.children[-1]
-                if last.type == "RETURN":
+        body_kids = body_node.children
+        if body_node.type is _BODY and len(body_kids) >= 2:
+            instrs = body_kids[1].children
+            if instrs:
+                last = instrs[-1]
+                if last.type is _RETURN:
                     had_return_instr = True
-                    if self.type_atom(last.children[0]) != NUMERIC:
-                        self.report.add(f"{ctx}: function return atom must be numeric")
+                    if self.type_atom(last.children[0]) is not NUMERIC:
+                        self.report.add(_ERR_RETURN_NUMERIC, ctx)
 
         if explicit_return_atom_node is None and not had_return_instr:
             self.report.add(
-                f"{ctx}: missing return atom (neither explicit return child nor RETURN instruction)"
+                "%s: missing return atom (neither explicit return child nor RETURN instruction)",
+                ctx,
             )
 
-    def check_func(self, func_node, ctx: str):
+    def check_func(self, func_node: "ASTNode", ctx: _Context) -> None:
         # FUNC: value=name, children = [PARAM(=VAR), ..., BODY, (optional) RETURN_ATOM]
         name = func_node.value
-        if not _is_typeless(self.scope, name):
-            self.report.add(f"{ctx}: function name '{name}' must be typeless")
-        if not func_node.children:
-            self.report.add(f"{ctx}: malformed FUNC (missing children)")
+        if not self._is_typeless(name):
+            self.report.add("%s: function name '%s' must be typeless", ctx, name)
+        kids = func_node.children
+        if not kids:
+            self.report.add("%s: malformed FUNC (missing children)", ctx)
             return
 
         # Detect whether the last child is an explicit return atom or not
-        if len(func_node.children) >= 2 and func_node.children[-1].type != "BODY":
-            explicit_return_atom = func_node.children[-1]
-            body = func_node.children[-2]
-            params = func_node.children[:-2]
+        last = kids[-1]
+        if len(kids) >= 2 and last.type is not _BODY:
+            explicit_return_atom = last
+            body = kids[-2]
+            params = kids[:-2]
         else:
             explicit_return_atom = None
-            body = func_node.children[-1]
-            params = func_node.children[:-1]
+            body = last
+            params = kids[:-1]
 
         self.push_scope(f"func {name}")
-        self.check_maxthree_vars(params, f"{ctx}/params")
-        self.check_body(body, f"{ctx}/body")
-        self._check_func_return_presence(body, explicit_return_atom, f"{ctx}/return")
+        self.check_maxthree_vars(params, _Ctx(ctx, "/params"))
+        self.check_body(body, _Ctx(ctx, "/body"))
+        self._check_func_return_presence(
+            body, explicit_return_atom, _Ctx(ctx, "/return")
+        )
         self.pop_scope()
 
-    def check_main(self, main_node, ctx: str):
+    def check_main(self, main_node: "ASTNode", ctx: _Context) -> None:
         # MAIN: children = [VARS_BLOCK, ALGO]
-        if main_node.type != "MAIN" or len(main_node.children) < 2:
-            self.report.add(f"{ctx}: malformed MAIN")
+        kids = main_node.children
+        if main_node.type is not _MAIN or len(kids) < 2:
+            self.report.add("%s: malformed MAIN", ctx)
             return
-        vars_block = main_node.children[0]
-        algo = main_node.children[1]
+        vars_block = kids[0]
+        algo = kids[1]
 
         self.push_scope("main")
-        self.check_variables_block(vars_block.children, f"{ctx}/vars")
-        self.check_algo(algo, f"{ctx}/algo")
+        self.check_variables_block(vars_block.children, _Ctx(ctx, "/vars"))
+        self.check_algo(algo, _Ctx(ctx, "/algo"))
         self.pop_scope()
 
-    def check_program(self, program_node):
+    def check_program(self, program_node: "ASTNode") -> TypeErrorReport:
         """
         PROGRAM children = [GLOBALS, PROCS, FUNCS, MAIN]
         GLOBALS.children = [VAR, VAR, ...]
         PROCS.children   = [PROC, ...]
         FUNCS.children   = [FUNC, ...]
         """
-        if program_node.type != "PROGRAM" or len(program_node.children) != 4:
+        kids = program_node.children
+        if program_node.type is not _PROGRAM or len(kids) != 4:
             self.report.add(
                 "PROGRAM: malformed (expected 4 children: GLOBALS, PROCS, FUNCS, MAIN)"
             )
             return self.report
 
-        globals_node, procs_node, funcs_node, main_node = program_node.children
+        globals_node, procs_node, funcs_node, main_node = kids
+        self._atom_types.clear()
+        self._term_types.clear()
+        self._typeless_names.clear()
 
         # globals
         self.push_scope("global")
@@ -497,19 +833,24 @@ class TypeChecker:
 
         # procs
         for i, p in enumerate(procs_node.children):
-            if p.type != "PROC":
-                self.report.add(f"proc[{i}]: expected PROC node, got {p.type}")
+            if self.report.fatal:
+                break
+            if p.type is not _PROC:
+                self.report.add("proc[%s]: expected PROC node, got %s", i, p.type)
                 continue
             self.check_proc(p, f"proc[{i}]")
 
         # funcs
         for i, f in enumerate(funcs_node.children):
-            if f.type != "FUNC":
-                self.report.add(f"func[{i}]: expected FUNC node, got {f.type}")
+            if self.report.fatal:
+                break
+            if f.type is not _FUNC:
+                self.report.add("func[%s]: expected FUNC node, got %s", i, f.type)
                 continue
             self.check_func(f, f"func[{i}]")
 
         # main
-        self.check_main(main_node, "main")
+        if not self.report.fatal:
+            self.check_main(main_node, "main")
         self.pop_scope()
         return self.report